@@ -1,11 +1,100 @@
 from flask import Flask
 import os
 from app.database.fetch_from_s3 import get_champs_and_models_txt
+from app.utils.core.http_caching import compress_response
+from app.utils.core.story_jobs import StoryJobManager
+
+def create_app(warm_up: bool = True):
+    """
+    Builds the app. With `warm_up` False neither the warm-up nor the checkpoint retention is
+    started here; the server is then expected to start them in each worker (see gunicorn.conf.py).
+    """
+    # Imported here, like the routes, so that importing the package (e.g. from a CLI) stays cheap
+    from app.database.checkpoint_retention import CheckpointRetention, start_checkpoint_retention
+    from app.warmup import Warmup, start_warmup
 
-def create_app():
     app = Flask(__name__, template_folder="templates", static_folder="static")
     get_champs_and_models_txt(os.path.join(app.static_folder))
 
+    # Story worker pool that runs every story
+    app.config.setdefault("STORY_WORKERS", int(os.getenv("STORY_WORKERS", 2)))
+    app.config.setdefault("STORY_QUEUE_DEPTH", int(os.getenv("STORY_QUEUE_DEPTH", 16)))
+    # Waiting stories a single client may hold, so one client cannot fill the whole queue
+    app.config.setdefault(
+        "STORY_QUEUE_PER_CLIENT",
+        int(os.getenv("STORY_QUEUE_PER_CLIENT", max(1, app.config["STORY_QUEUE_DEPTH"] // 4))),
+    )
+    # Identical submissions within this window reuse the finished story instead of running again
+    app.config.setdefault("STORY_DEDUPE_WINDOW_SECONDS", float(os.getenv("STORY_DEDUPE_WINDOW_SECONDS", 600)))
+    # Run stories as asyncio tasks on one event loop; STORY_WORKERS then caps concurrent stories
+    app.config.setdefault("STORY_ASYNC", os.getenv("STORY_ASYNC", "false").lower() in ("1", "true", "yes"))
+    app.extensions["story_jobs"] = StoryJobManager(
+        max_workers=app.config["STORY_WORKERS"],
+        max_queue=app.config["STORY_QUEUE_DEPTH"],
+        max_queued_per_client=app.config["STORY_QUEUE_PER_CLIENT"],
+        dedupe_window=app.config["STORY_DEDUPE_WINDOW_SECONDS"],
+        run_async=app.config["STORY_ASYNC"],
+    )
+    # Time budget of a story from submission; once it runs low the story skips its remaining
+    # events and goes straight to the novel. The reserve is the time kept for the novel (0 = no deadline)
+    app.config.setdefault("STORY_DEADLINE_SECONDS", float(os.getenv("STORY_DEADLINE_SECONDS", 180)))
+    app.config.setdefault("STORY_DEADLINE_RESERVE_SECONDS", float(os.getenv("STORY_DEADLINE_RESERVE_SECONDS", 20)))
+    # How long /submit-data waits for its story before answering 504 (the job keeps running and can be
+    # polled); twice the deadline by default, the deadline only starts the wrap-up (0 = wait forever)
+    app.config.setdefault(
+        "STORY_WAIT_TIMEOUT_SECONDS",
+        float(os.getenv("STORY_WAIT_TIMEOUT_SECONDS", 2 * app.config["STORY_DEADLINE_SECONDS"])),
+    )
+    # A story still recorded as running is only resumed (POST /stories/<id>/resume) after this long;
+    # its worker is then presumed dead. Failed or cancelled stories can be resumed at once
+    app.config.setdefault("STORY_RESUME_AFTER_SECONDS", float(os.getenv("STORY_RESUME_AFTER_SECONDS", 600)))
+    # Checkpointer of the stories (see StoryTeller.CHECKPOINTERS); unset picks the SQLite saver
+    # matching STORY_ASYNC. Only the SQLite savers keep a story's state after it finished
+    app.config.setdefault("STORY_CHECKPOINTER", os.getenv("STORY_CHECKPOINTER") or None)
+    if app.config["STORY_CHECKPOINTER"] == ("sqlite" if app.config["STORY_ASYNC"] else "aiosqlite"):
+        raise ValueError(
+            f"STORY_CHECKPOINTER={app.config['STORY_CHECKPOINTER']} does not work with "
+            f"STORY_ASYNC={app.config['STORY_ASYNC']}."
+        )
+
+    # Warm-up of clients and databases: "background", "blocking" or "off"; /readyz reports it
+    app.config.setdefault("WARMUP", os.getenv("WARMUP", "background"))
+    # Most-used champions whose lore is preloaded during the warm-up
+    app.config.setdefault("WARMUP_LORE_CHAMPIONS", int(os.getenv("WARMUP_LORE_CHAMPIONS", 8)))
+    app.extensions["warmup"] = Warmup(lore_champions=app.config["WARMUP_LORE_CHAMPIONS"])
+
+    # Checkpoint retention: per story thread the last CHECKPOINT_KEEP_LAST checkpoints are kept,
+    # threads idle for CHECKPOINT_MAX_AGE_DAYS are deleted (interval 0 = no background retention)
+    app.config.setdefault("CHECKPOINT_KEEP_LAST", int(os.getenv("CHECKPOINT_KEEP_LAST", 20)))
+    app.config.setdefault("CHECKPOINT_MAX_AGE_DAYS", float(os.getenv("CHECKPOINT_MAX_AGE_DAYS", 7)))
+    app.config.setdefault(
+        "CHECKPOINT_RETENTION_INTERVAL_SECONDS", float(os.getenv("CHECKPOINT_RETENTION_INTERVAL_SECONDS", 3600))
+    )
+    app.config.setdefault(
+        "CHECKPOINT_VACUUM_INTERVAL_SECONDS", float(os.getenv("CHECKPOINT_VACUUM_INTERVAL_SECONDS", 7 * 24 * 3600))
+    )
+    app.extensions["checkpoint_retention"] = CheckpointRetention(
+        keep_last=app.config["CHECKPOINT_KEEP_LAST"],
+        max_age_days=app.config["CHECKPOINT_MAX_AGE_DAYS"],
+        interval_seconds=app.config["CHECKPOINT_RETENTION_INTERVAL_SECONDS"],
+        vacuum_interval_seconds=app.config["CHECKPOINT_VACUUM_INTERVAL_SECONDS"],
+    )
+    if warm_up:
+        start_warmup(app)
+        start_checkpoint_retention(app)
+
+    # JSON responses (stories, transcripts) are compressed once they reach this size
+    app.config.setdefault("COMPRESS_MIN_BYTES", int(os.getenv("COMPRESS_MIN_BYTES", 1024)))
+    app.config.setdefault("COMPRESS_GZIP_LEVEL", int(os.getenv("COMPRESS_GZIP_LEVEL", 6)))
+    app.config.setdefault("COMPRESS_ZSTD_LEVEL", int(os.getenv("COMPRESS_ZSTD_LEVEL", 3)))
+    app.after_request(compress_response)
+    # Browser cache lifetime of an unversioned catalog URL; versioned URLs are cached for good
+    app.config.setdefault("CATALOG_MAX_AGE_SECONDS", int(os.getenv("CATALOG_MAX_AGE_SECONDS", 3600)))
+    # GET /debug/graph, a diagram of the story graph (see app.utils.core.graph_diagram)
+    app.config.setdefault(
+        "GRAPH_DIAGRAM_ENDPOINT", os.getenv("GRAPH_DIAGRAM_ENDPOINT", "false").lower() in ("1", "true", "yes")
+    )
+
     from app.routes import bp
     app.register_blueprint(bp)
 
@@ -1,8 +1,35 @@
 
 import json
+import threading
 
-def fetch_data_from_s3(character_name, attribute, source="champions_fandom"):
+# One S3 client per process: boto3 clients are thread-safe, but creating one costs more than
+# most lore fetches. Keyed by pid, so a forked worker never reuses its parent's connections.
+_s3_client = None
+_s3_client_pid = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
     import boto3
+    import os
+    from dotenv import load_dotenv
+
+    global _s3_client, _s3_client_pid
+
+    with _s3_client_lock:
+        if _s3_client is None or _s3_client_pid != os.getpid():
+            load_dotenv()
+            _s3_client = boto3.client(
+                's3',
+                aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
+                aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
+                region_name=os.getenv("S3_REGION")
+            )
+            _s3_client_pid = os.getpid()
+        return _s3_client
+
+
+def fetch_data_from_s3(character_name, attribute, source="champions_fandom"):
     from botocore.exceptions import NoCredentialsError, PartialCredentialsError
     import os
     from dotenv import load_dotenv
@@ -11,12 +38,7 @@ def fetch_data_from_s3(character_name, attribute, source="champions_fandom"):
 
     bucket = os.getenv("S3_BUCKET")
 
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
-        aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
-        region_name=os.getenv("S3_REGION")
-    )
+    s3 = get_s3_client()
 
     try:
         if attribute == "background":
@@ -0,0 +1,199 @@
+"""
+Retention of the LangGraph checkpoint database (see checkpoint_store).
+
+Every story step adds a checkpoint and its writes, and nothing else ever deletes them. The
+retention keeps, per story thread, only the last `keep_last` checkpoints (the latest one is all
+a resume needs), drops threads whose newest checkpoint is older than `max_age_days`, deletes the
+writes left without their checkpoint, truncates the WAL and, less often, VACUUMs the file.
+
+It runs in the background of every worker (see start_checkpoint_retention), or from the command line:
+
+    python -m app.database.checkpoint_retention --keep-last 20 --max-age-days 7 --vacuum
+"""
+import argparse
+import os
+import threading
+import time
+from typing import Any, Dict
+from langgraph.checkpoint.base.id import UUID
+from app.database.checkpoint_store import PooledSqliteSaver, get_checkpoint_store
+
+# Offset between the uuid6 epoch (1582-10-15) and the Unix epoch, in 100 ns intervals
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+_MAINTENANCE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_maintenance (
+    task TEXT PRIMARY KEY,
+    last_run REAL NOT NULL
+);
+"""
+
+
+def _checkpoint_id_at(timestamp: float) -> str:
+    """
+    Smallest checkpoint id created at `timestamp`. Checkpoint ids are uuid6, whose string form
+    sorts by creation time, so `checkpoint_id < _checkpoint_id_at(t)` means "created before t".
+    """
+    ticks = int(timestamp * 1e7) + _UUID_EPOCH_OFFSET
+    return str(UUID(int=((ticks >> 12) << 80) | ((ticks & 0x0FFF) << 64), version=6))
+
+
+class CheckpointRetention:
+    """
+    Retention policy of the checkpoint database.
+
+    Parameters
+    ----------
+    keep_last : int
+        Checkpoints kept per thread; older ones are deleted with their writes.
+    max_age_days : float
+        Threads whose newest checkpoint is older than this are deleted entirely.
+    interval_seconds : float
+        Pause between two background runs.
+    vacuum_interval_seconds : float
+        Minimal time between two VACUUMs in the background.
+    """
+
+    def __init__(
+        self,
+        keep_last: int = 20,
+        max_age_days: float = 7,
+        interval_seconds: float = 3600,
+        vacuum_interval_seconds: float = 7 * 24 * 3600,
+    ):
+        self.keep_last = max(1, int(keep_last))
+        self.max_age_days = max_age_days
+        self.interval_seconds = interval_seconds
+        self.vacuum_interval_seconds = vacuum_interval_seconds
+        self._thread = None
+
+    def run(self, store: PooledSqliteSaver = None, vacuum: bool = False) -> Dict[str, Any]:
+        """
+        Prunes and compacts the database once. Returns what was done.
+        """
+        store = store or get_checkpoint_store()
+        size_before = _db_size(store.db_path)
+        stats = self.prune(store)
+        stats.update(self.compact(store, vacuum))
+        stats["size_before"] = size_before
+        stats["size_after"] = _db_size(store.db_path)
+        return stats
+
+    def prune(self, store: PooledSqliteSaver) -> Dict[str, int]:
+        cutoff = _checkpoint_id_at(time.time() - self.max_age_days * 24 * 3600)
+        with store.cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM checkpoints WHERE thread_id IN (
+                    SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(checkpoint_id) < ?
+                )
+                """,
+                (cutoff,),
+            )
+            expired = cur.rowcount
+            cur.execute(
+                """
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                        ) AS newer
+                        FROM checkpoints
+                    ) WHERE newer > ?
+                )
+                """,
+                (self.keep_last,),
+            )
+            superseded = cur.rowcount
+            cur.execute(
+                """
+                DELETE FROM writes WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                      AND c.checkpoint_ns = writes.checkpoint_ns
+                      AND c.checkpoint_id = writes.checkpoint_id
+                )
+                """
+            )
+            writes = cur.rowcount
+        return {"expired_checkpoints": expired, "superseded_checkpoints": superseded, "orphan_writes": writes}
+
+    @staticmethod
+    def compact(store: PooledSqliteSaver, vacuum: bool = False) -> Dict[str, Any]:
+        """
+        Moves the WAL into the database and truncates it; VACUUM rewrites the file to release
+        the pages freed by pruning. Both wait for (and are blocked by) concurrent readers.
+        """
+        with store.cursor(transaction=False) as cur:
+            if vacuum:
+                # Rewrites the file through the WAL, so it goes first
+                cur.execute("VACUUM")
+            busy, _, _ = cur.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return {"wal_truncated": not busy, "vacuumed": vacuum}
+
+    def start(self):
+        """
+        Runs the retention every `interval_seconds` in a daemon thread. Every worker process runs
+        one; a run is claimed in the database first, so only one of them prunes per interval.
+        """
+        if self._thread is not None or self.interval_seconds <= 0:
+            return
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-retention", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval_seconds)
+            try:
+                store = get_checkpoint_store()
+                if self._claim(store, "prune", self.interval_seconds):
+                    vacuum = self._claim(store, "vacuum", self.vacuum_interval_seconds)
+                    print(f"Checkpoint retention: {self.run(store, vacuum=vacuum)}")
+            except Exception as e:
+                print(f"Checkpoint retention failed: {e}")
+
+    @staticmethod
+    def _claim(store: PooledSqliteSaver, task: str, interval: float) -> bool:
+        """
+        Records a run of `task` unless one was recorded less than `interval` seconds ago.
+        """
+        now = time.time()
+        with store.cursor() as cur:
+            cur.executescript(_MAINTENANCE_SCHEMA)
+            cur.execute("BEGIN IMMEDIATE")
+            row = cur.execute("SELECT last_run FROM checkpoint_maintenance WHERE task = ?", (task,)).fetchone()
+            if row is not None and now - row[0] < interval * 0.9:
+                return False
+            cur.execute(
+                "INSERT INTO checkpoint_maintenance (task, last_run) VALUES (?, ?) "
+                "ON CONFLICT(task) DO UPDATE SET last_run = excluded.last_run",
+                (task, now),
+            )
+        return True
+
+
+def _db_size(db_path: str) -> int:
+    return sum(os.path.getsize(path) for path in (db_path, f"{db_path}-wal") if os.path.exists(path))
+
+
+def start_checkpoint_retention(app):
+    """
+    Starts the background retention of `app` (see CHECKPOINT_RETENTION_* in create_app); called
+    with the warm-up, by create_app or by the server after forking a worker.
+    """
+    app.extensions["checkpoint_retention"].start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep-last", type=int, default=20, help="checkpoints kept per thread")
+    parser.add_argument("--max-age-days", type=float, default=7, help="threads idle for longer are deleted")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards")
+    args = parser.parse_args()
+
+    retention = CheckpointRetention(keep_last=args.keep_last, max_age_days=args.max_age_days)
+    print(retention.run(vacuum=args.vacuum))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Serializer of the story checkpoints (see checkpoint_store and StoryTeller.CHECKPOINTERS).
+
+LangGraph's JsonPlusSerializer encodes every message as a generic pydantic object: module and
+class name, the full model_dump with all its defaults, revived through an import on load. A
+story's state is mostly messages, so StorySerializer gives them, and the deque of the
+remaining events, their own compact msgpack extension types; everything else is encoded as
+JsonPlusSerializer does. Payloads of at least `compress_min_bytes` are also zstd-compressed.
+
+Checkpoints written by JsonPlusSerializer still load; checkpoints written here need this
+serializer to load.
+
+    python benchmarks/checkpoint_serde.py
+"""
+import os
+import threading
+from collections import deque
+from typing import Any, Optional, Tuple
+import ormsgpack
+import zstandard
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import (
+    JsonPlusSerializer,
+    _msgpack_default,
+    _msgpack_ext_hook,
+    _option,
+)
+
+load_dotenv()
+
+# Well clear of the extension codes of JsonPlusSerializer (0 to 6)
+EXT_MESSAGE = 100
+EXT_DEQUE = 101
+
+# Messages with a compact encoding, by class name; other messages (RemoveMessage, chunks,
+# subclasses) are encoded as JsonPlusSerializer does
+_MESSAGE_CLASSES = {cls.__name__: cls for cls in (AIMessage, HumanMessage, SystemMessage, ToolMessage)}
+
+ZSTD_TYPE = "msgpack+zstd"
+
+
+class StorySerializer(JsonPlusSerializer):
+    """
+    JsonPlusSerializer with compact messages and deques, and zstd compression of large payloads.
+
+    Parameters
+    ----------
+    compress_min_bytes : int
+        Encoded payloads of at least this size are zstd-compressed; 0 disables compression.
+    zstd_level : int
+        zstd compression level.
+    **kwargs
+        Passed on to JsonPlusSerializer.
+    """
+
+    def __init__(self, compress_min_bytes: int = 4096, zstd_level: int = 3, **kwargs):
+        super().__init__(**kwargs)
+        self.compress_min_bytes = int(compress_min_bytes)
+        self.zstd_level = int(zstd_level)
+        self._unpack_ext_hook = self._ext_hook
+        # zstd contexts must not be shared by concurrent calls; one per thread
+        self._local = threading.local()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if obj is None or isinstance(obj, (bytes, bytearray)):
+            return super().dumps_typed(obj)
+        try:
+            data = ormsgpack.packb(obj, default=self._default, option=_option)
+        except (ormsgpack.MsgpackEncodeError, TypeError):
+            # Whatever the compact encoding cannot handle goes through JsonPlusSerializer as is
+            return super().dumps_typed(obj)
+
+        if self.compress_min_bytes and len(data) >= self.compress_min_bytes:
+            return ZSTD_TYPE, self._compressor().compress(data)
+        return "msgpack", data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, data_ = data
+        if type_ == ZSTD_TYPE:
+            return super().loads_typed(("msgpack", self._decompressor().decompress(data_)))
+        return super().loads_typed(data)
+
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, BaseMessage) and _MESSAGE_CLASSES.get(type(obj).__name__) is type(obj):
+            # Only the fields that are set, e.g. content and id for most messages: in these classes
+            # a field holding an empty value (None, {}, [], False) is at its default
+            fields = {k: v for k, v in obj.__dict__.items() if k != "type" and (v or k == "content")}
+            return ormsgpack.Ext(EXT_MESSAGE, self._pack((type(obj).__name__, fields)))
+        if isinstance(obj, deque):
+            return ormsgpack.Ext(EXT_DEQUE, self._pack((list(obj), obj.maxlen)))
+        return _msgpack_default(obj)
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == EXT_MESSAGE:
+            name, fields = self._unpack(data)
+            return _MESSAGE_CLASSES[name](**fields)
+        if code == EXT_DEQUE:
+            items, maxlen = self._unpack(data)
+            return deque(items, maxlen)
+        return _msgpack_ext_hook(code, data)
+
+    def _pack(self, obj: Any) -> bytes:
+        return ormsgpack.packb(obj, default=self._default, option=_option)
+
+    def _unpack(self, data: bytes) -> Any:
+        return ormsgpack.unpackb(data, ext_hook=self._ext_hook, option=ormsgpack.OPT_NON_STR_KEYS)
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.zstd_level)
+        return compressor
+
+    def _decompressor(self) -> zstandard.ZstdDecompressor:
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        return decompressor
+
+
+# Global serializer, initialized once per process and used by every checkpointer
+checkpoint_serializer_instance: Optional[StorySerializer] = None
+_init_lock = threading.Lock()
+
+
+def checkpoint_serializer() -> StorySerializer:
+    """Returns the process-wide checkpoint serializer, creating it on first use."""
+    global checkpoint_serializer_instance
+
+    if checkpoint_serializer_instance is None:
+        with _init_lock:
+            if checkpoint_serializer_instance is None:
+                checkpoint_serializer_instance = StorySerializer(
+                    compress_min_bytes=int(os.getenv("CHECKPOINT_COMPRESS_MIN_BYTES", 4096)),
+                    zstd_level=int(os.getenv("CHECKPOINT_ZSTD_LEVEL", 3)),
+                )
+    return checkpoint_serializer_instance
@@ -0,0 +1,171 @@
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+from dotenv import load_dotenv
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.sqlite import SqliteSaver
+from app.database.checkpoint_serde import checkpoint_serializer
+
+load_dotenv()
+
+
+def _default_db_path() -> str:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(base_dir, "..", "..", "logs", "langgraph_checkpoints.sqlite"))
+
+
+def checkpoint_db_path() -> str:
+    return os.getenv("CHECKPOINT_DB_PATH", _default_db_path())
+
+
+def connection_pragmas(busy_timeout_ms: int, cache_size_kib: int) -> List[str]:
+    """
+    PRAGMAs of every checkpoint connection: WAL so readers do not wait for the writer,
+    synchronous=NORMAL (durable at every WAL checkpoint, not at every commit), a busy timeout
+    so concurrent writers queue instead of failing, and a bounded page cache.
+    """
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+        f"PRAGMA cache_size=-{int(cache_size_kib)}",
+    ]
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver over a small pool of tuned connections, shared by every StoryTeller of the process.
+
+    SqliteSaver serializes all access through one connection and one lock. Here every cursor()
+    borrows a connection from the pool for its duration instead, so stories running on different
+    threads read and write their checkpoints concurrently. While a thread holds a connection,
+    `self.conn` is that connection, which keeps SqliteSaver.list (it reads the writes through
+    `self.conn.cursor()`) on the connection of its cursor.
+
+    Parameters
+    ----------
+    db_path : str
+        Path of the SQLite file.
+    pool_size : int
+        Number of connections.
+    busy_timeout_ms : int
+        How long a writer waits for another writer before failing.
+    cache_size_kib : int
+        Page cache of each connection.
+    serde : SerializerProtocol
+        Serializer of the checkpoints; SqliteSaver's default if None.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 4,
+        busy_timeout_ms: int = 5000,
+        cache_size_kib: int = 8192,
+        serde: SerializerProtocol = None,
+    ):
+        self.db_path = db_path
+        self.pragmas = connection_pragmas(busy_timeout_ms, cache_size_kib)
+        self._local = threading.local()
+        self._setup_lock = threading.Lock()
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._connections: List[sqlite3.Connection] = []
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        for _ in range(max(1, int(pool_size))):
+            conn = self._connect()
+            self._connections.append(conn)
+            self._pool.put(conn)
+        super().__init__(self._connections[0], serde=serde)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            raise RuntimeError("PooledSqliteSaver connections are only available inside cursor().")
+        return conn
+
+    @conn.setter
+    def conn(self, value: sqlite3.Connection):
+        # Assigned by SqliteSaver.__init__; connections are handed out by _borrow instead
+        pass
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _borrow(self) -> Iterator[sqlite3.Connection]:
+        """
+        Takes a connection from the pool for the current thread; a thread that already holds
+        one (a nested call) keeps using it.
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self._pool.get()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._pool.put(conn)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        with self._setup_lock, self._borrow():
+            super().setup()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        self.setup()
+        with self._borrow() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                if transaction:
+                    conn.commit()
+                cur.close()
+
+    def close(self):
+        """
+        Closes every connection of the pool; connections in use are closed as well.
+        """
+        for conn in self._connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Could not close a checkpoint connection: {e}")
+        self._connections.clear()
+
+
+# Global store, initialized once per process and used throughout
+checkpoint_store: PooledSqliteSaver = None
+_init_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> PooledSqliteSaver:
+    """Returns the process-wide checkpoint store, creating it on first use; it is closed at exit."""
+    global checkpoint_store
+
+    if checkpoint_store is None:
+        with _init_lock:
+            if checkpoint_store is None:
+                checkpoint_store = PooledSqliteSaver(
+                    db_path=checkpoint_db_path(),
+                    pool_size=int(os.getenv("CHECKPOINT_POOL_SIZE", 4)),
+                    busy_timeout_ms=int(os.getenv("CHECKPOINT_BUSY_TIMEOUT_MS", 5000)),
+                    cache_size_kib=int(os.getenv("CHECKPOINT_CACHE_SIZE_KIB", 8192)),
+                    serde=checkpoint_serializer(),
+                )
+                atexit.register(checkpoint_store.close)
+    return checkpoint_store
@@ -1,11 +1,11 @@
-import boto3
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 def get_champs_and_models_txt(save_path: str):
+    import boto3
+    from botocore.exceptions import NoCredentialsError, PartialCredentialsError
 
     bucket = os.getenv("S3_BUCKET")
 
@@ -0,0 +1,220 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS preflight_cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_preflight_cache_last_access ON preflight_cache (last_access);
+CREATE TABLE IF NOT EXISTS preflight_cache_stats (
+    namespace TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def _default_db_path() -> str:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(base_dir, "..", "..", "logs", "preflight_cache.sqlite"))
+
+
+class PreflightCache:
+    """
+    Persistent cache for preflight LLM answers (story validation, personality inference).
+
+    Entries live in a local SQLite file so that every worker process on the host shares them.
+    Entries expire after `ttl_seconds`; once more than `max_entries` are stored, the least
+    recently used ones are evicted. Hit/miss counters are kept per namespace in the same file.
+
+    Lookups are read-only most of the time, so that they do not contend for the SQLite write
+    lock: an entry's last access is only updated once it is older than `touch_interval_seconds`,
+    expired entries are deleted by the next write, and hit/miss counts are added up in memory
+    and written every `stats_flush_seconds` (and on exit).
+
+    Parameters
+    ----------
+    db_path : str
+        Path of the SQLite file.
+    ttl_seconds : float
+        Time to live of an entry, counted from when it was stored.
+    max_entries : int
+        Maximum number of entries across all namespaces.
+    touch_interval_seconds : float
+        Granularity of the last access time used for LRU eviction.
+    stats_flush_seconds : float
+        How often the in-memory hit/miss counts are written to the file.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        touch_interval_seconds: float = 3600,
+        stats_flush_seconds: float = 30,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.touch_interval_seconds = touch_interval_seconds
+        self.stats_flush_seconds = stats_flush_seconds
+        self._local = threading.local()
+        # Hit/miss counts not written yet: namespace -> [hits, misses]
+        self._pending_counts: Dict[str, list] = {}
+        self._counts_lock = threading.Lock()
+        self._last_flush = time.time()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        One connection per thread; sqlite3 connections must not be shared across threads.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Builds a fixed-size key from already normalized inputs.
+        """
+        raw = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        try:
+            with self._conn() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at, last_access FROM preflight_cache WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    # Left for _evict, the next write deletes it
+                    row = None
+                if row is not None and now - row[2] > self.touch_interval_seconds:
+                    conn.execute(
+                        "UPDATE preflight_cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                        (now, namespace, key),
+                    )
+        except sqlite3.Error as e:
+            print(f"Preflight cache read failed: {e}")
+            return None
+        self._count(namespace, hit=row is not None)
+        if now - self._last_flush >= self.stats_flush_seconds:
+            self.flush_stats()
+        return json.loads(row[0]) if row is not None else None
+
+    def set(self, namespace: str, key: str, value: Any):
+        now = time.time()
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO preflight_cache (namespace, key, value, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value), now, now),
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"Preflight cache write failed: {e}")
+
+    def flush_stats(self):
+        """
+        Writes the hit/miss counts gathered in memory since the last flush.
+        """
+        with self._counts_lock:
+            pending, self._pending_counts = self._pending_counts, {}
+            self._last_flush = time.time()
+        if not pending:
+            return
+        try:
+            with self._conn() as conn:
+                conn.executemany(
+                    "INSERT INTO preflight_cache_stats (namespace, hits, misses) VALUES (?, ?, ?) "
+                    "ON CONFLICT(namespace) DO UPDATE SET "
+                    "hits = hits + excluded.hits, misses = misses + excluded.misses",
+                    [(namespace, hits, misses) for namespace, (hits, misses) in pending.items()],
+                )
+        except sqlite3.Error as e:
+            print(f"Preflight cache stats write failed: {e}")
+            # Kept for the next flush
+            for namespace, (hits, misses) in pending.items():
+                self._count(namespace, hit=True, n=hits)
+                self._count(namespace, hit=False, n=misses)
+
+    def stats(self) -> Dict[str, Any]:
+        self.flush_stats()
+        with self._conn() as conn:
+            counters = {
+                namespace: {"hits": hits, "misses": misses}
+                for namespace, hits, misses in conn.execute(
+                    "SELECT namespace, hits, misses FROM preflight_cache_stats"
+                )
+            }
+            entries = conn.execute("SELECT COUNT(*) FROM preflight_cache").fetchone()[0]
+        return {
+            "entries": entries,
+            "hits": sum(c["hits"] for c in counters.values()),
+            "misses": sum(c["misses"] for c in counters.values()),
+            "namespaces": counters,
+        }
+
+    def _count(self, namespace: str, hit: bool, n: int = 1):
+        with self._counts_lock:
+            self._pending_counts.setdefault(namespace, [0, 0])[0 if hit else 1] += n
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute(
+            "DELETE FROM preflight_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        excess = conn.execute("SELECT COUNT(*) FROM preflight_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM preflight_cache WHERE rowid IN "
+                "(SELECT rowid FROM preflight_cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,),
+            )
+
+
+# Global cache, initialized once per process and used throughout
+preflight_cache: PreflightCache = None
+_init_lock = threading.Lock()
+
+
+def get_preflight_cache() -> PreflightCache:
+    """Returns the process-wide PreflightCache, creating it on first use."""
+    global preflight_cache
+
+    if preflight_cache is None:
+        with _init_lock:
+            if preflight_cache is None:
+                preflight_cache = PreflightCache(
+                    db_path=os.getenv("PREFLIGHT_CACHE_PATH", _default_db_path()),
+                    ttl_seconds=float(os.getenv("PREFLIGHT_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+                    max_entries=int(os.getenv("PREFLIGHT_CACHE_MAX_ENTRIES", 10000)),
+                    touch_interval_seconds=float(os.getenv("PREFLIGHT_CACHE_TOUCH_INTERVAL_SECONDS", 3600)),
+                    stats_flush_seconds=float(os.getenv("PREFLIGHT_CACHE_STATS_FLUSH_SECONDS", 30)),
+                )
+                atexit.register(preflight_cache.flush_stats)
+    return preflight_cache
@@ -0,0 +1,262 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import zstandard
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    story_id TEXT PRIMARY KEY,
+    fingerprint TEXT,
+    idempotency_key TEXT,
+    scenario TEXT NOT NULL,
+    champions TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stories_completed_at ON stories (completed_at);
+CREATE INDEX IF NOT EXISTS idx_stories_fingerprint ON stories (fingerprint);
+CREATE TABLE IF NOT EXISTS unfinished_stories (
+    story_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    idempotency_key TEXT,
+    body BLOB NOT NULL
+);
+"""
+
+# Columns added after the first release, with their indexes; added to older files on open
+_ADDED_COLUMNS = {
+    "stories": {"idempotency_key": "TEXT"},
+    "unfinished_stories": {"idempotency_key": "TEXT"},
+}
+_ADDED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_stories_idempotency_key ON stories (idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_unfinished_stories_idempotency_key ON unfinished_stories (idempotency_key);
+"""
+
+
+def _default_db_path() -> str:
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.abspath(os.path.join(base_dir, "..", "..", "logs", "stories.sqlite"))
+
+
+class StoryStore:
+    """
+    Local store of finished stories, keyed by story id.
+
+    The full story response (novel, script, champions, ...) is kept as zstd-compressed JSON;
+    scenario, champion names and completion time are kept in plain columns for listings.
+
+    Stories that started but did not finish are kept apart, with what is needed to resume them
+    (see save_unfinished); finishing a story removes that record.
+
+    Both kinds of record keep the idempotency key the story was submitted with, so that a
+    retried request is recognized by every worker process (see find_by_idempotency_key).
+
+    Parameters
+    ----------
+    db_path : str
+        Path of the SQLite file.
+    compression_level : int
+        zstd compression level of the story bodies.
+    """
+
+    def __init__(self, db_path: str, compression_level: int = 9):
+        self.db_path = db_path
+        self.compression_level = compression_level
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+            for table, columns in _ADDED_COLUMNS.items():
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for column, column_type in columns.items():
+                    if column not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            conn.executescript(_ADDED_INDEXES)
+
+    def _conn(self) -> sqlite3.Connection:
+        """
+        One connection per thread; sqlite3 connections must not be shared across threads.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _compress(self, payload: Dict[str, Any]) -> bytes:
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return zstandard.ZstdCompressor(level=self.compression_level).compress(raw)
+
+    @staticmethod
+    def _decompress(body: bytes) -> Dict[str, Any]:
+        return json.loads(zstandard.ZstdDecompressor().decompress(body))
+
+    def save(
+        self,
+        story_id: str,
+        scenario: str,
+        champions: List[Dict[str, Any]],
+        payload: Dict[str, Any],
+        fingerprint: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stories "
+                "(story_id, fingerprint, idempotency_key, scenario, champions, completed_at, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    story_id,
+                    fingerprint,
+                    idempotency_key,
+                    scenario,
+                    json.dumps([c["name"] for c in champions]),
+                    time.time(),
+                    self._compress(payload),
+                ),
+            )
+            conn.execute("DELETE FROM unfinished_stories WHERE story_id = ?", (story_id,))
+
+    def save_unfinished(self, story_id: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None):
+        """
+        Records a story that is starting (status "running") with `payload`, what its run needs
+        to be resumed: the preflighted request, the start frame and the summarized lore.
+        """
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO unfinished_stories (story_id, status, updated_at, idempotency_key, body) "
+                "VALUES (?, 'running', ?, ?, ?)",
+                (story_id, time.time(), idempotency_key, self._compress(payload)),
+            )
+
+    def mark_interrupted(self, story_id: str):
+        """
+        Marks a story whose run stopped (failed or cancelled) as interrupted, i.e. resumable at once.
+        """
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE unfinished_stories SET status = 'interrupted', updated_at = ? WHERE story_id = ?",
+                (time.time(), story_id),
+            )
+
+    def get_unfinished(self, story_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT status, updated_at, idempotency_key, body FROM unfinished_stories WHERE story_id = ?",
+            (story_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            **self._decompress(row[3]),
+            "story_id": story_id,
+            "status": row[0],
+            "updated_at": row[1],
+            "idempotency_key": row[2],
+        }
+
+    def find_by_idempotency_key(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the story submitted with this idempotency key, None if there is none: the finished
+        story as {"story_id", "fingerprint", "finished": True, "story": payload}, otherwise the newest
+        unfinished one as {"story_id", "finished": False, "status", "updated_at"}.
+        """
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT story_id, fingerprint, body FROM stories WHERE idempotency_key = ? "
+            "ORDER BY completed_at DESC LIMIT 1",
+            (idempotency_key,),
+        ).fetchone()
+        if row is not None:
+            return {"story_id": row[0], "fingerprint": row[1], "finished": True, "story": self._decompress(row[2])}
+        row = conn.execute(
+            "SELECT story_id, status, updated_at FROM unfinished_stories WHERE idempotency_key = ? "
+            "ORDER BY updated_at DESC LIMIT 1",
+            (idempotency_key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"story_id": row[0], "finished": False, "status": row[1], "updated_at": row[2]}
+
+    def get(self, story_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT completed_at, body FROM stories WHERE story_id = ?", (story_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"story_id": story_id, "completed_at": row[0], **self._decompress(row[1])}
+
+    def find_recent(self, fingerprint: str, max_age: float) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Returns (story_id, payload) of the newest story with this fingerprint that finished
+        less than `max_age` seconds ago.
+        """
+        row = self._conn().execute(
+            "SELECT story_id, body FROM stories WHERE fingerprint = ? AND completed_at >= ? "
+            "ORDER BY completed_at DESC LIMIT 1",
+            (fingerprint, time.time() - max_age),
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], self._decompress(row[1])
+
+    def list(self, page: int = 1, per_page: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Returns one page of story summaries, newest first, and the total number of stories.
+        """
+        conn = self._conn()
+        total = conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+        rows = conn.execute(
+            "SELECT story_id, scenario, champions, completed_at FROM stories "
+            "ORDER BY completed_at DESC LIMIT ? OFFSET ?",
+            (per_page, (page - 1) * per_page),
+        ).fetchall()
+        stories = [
+            {
+                "story_id": story_id,
+                "scenario": scenario,
+                "champions": json.loads(champions),
+                "completed_at": completed_at,
+            }
+            for story_id, scenario, champions, completed_at in rows
+        ]
+        return stories, total
+
+    def top_champions(self, limit: int, recent: int = 500) -> List[str]:
+        """
+        Returns the names of the champions that appear most often in the `recent` newest stories.
+        """
+        rows = self._conn().execute(
+            "SELECT champions FROM stories ORDER BY completed_at DESC LIMIT ?", (recent,)
+        ).fetchall()
+        counts = Counter(name for (champions,) in rows for name in json.loads(champions))
+        return [name for name, _ in counts.most_common(limit)]
+
+
+# Global store, initialized once per process and used throughout
+story_store: StoryStore = None
+_init_lock = threading.Lock()
+
+
+def get_story_store() -> StoryStore:
+    """Returns the process-wide StoryStore, creating it on first use."""
+    global story_store
+
+    if story_store is None:
+        with _init_lock:
+            if story_store is None:
+                story_store = StoryStore(
+                    db_path=os.getenv("STORY_STORE_PATH", _default_db_path()),
+                    compression_level=int(os.getenv("STORY_STORE_ZSTD_LEVEL", 9)),
+                )
+    return story_store
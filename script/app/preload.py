@@ -0,0 +1,52 @@
+import importlib
+import os
+from dotenv import load_dotenv
+from app.utils.constants.champion_lore import preload_lore
+from app.utils.constants.roles import Role
+
+load_dotenv()
+
+# Imported lazily by the code that uses them; importing them before the fork shares their
+# memory with every worker instead of paying the import in each one
+_HEAVY_MODULES = (
+    "boto3",
+    "google.generativeai",
+    "langchain.chat_models",
+    "langchain_google_genai",
+    "langgraph.checkpoint.sqlite",
+    "langgraph.checkpoint.sqlite.aio",
+    "pandas",
+)
+
+# Roles in the registry that are pipeline bots, not champions
+_NON_CHAMPION_ROLES = {"Event", "RoleAssigner", "Summarizer", "Novel"}
+
+
+def preload_shared_state():
+    """
+    Loads the read-only state every worker needs, in the server's master process before it forks:
+    the Role registry, the heavy library imports and the raw lore of PRELOAD_LORE_CHAMPIONS
+    (comma separated champion names, or "all").
+    No network client is kept open afterwards, so the fork stays safe; the LLM clients are
+    created by the warm-up of each worker (see app.warmup).
+    """
+    print(f"Preloading shared state: {len(Role)} roles")
+    for module in _HEAVY_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Could not preload {module}: {e}")
+
+    champions = _preload_lore_champions()
+    if champions:
+        preload_lore(champions)
+        print(f"Preloaded lore of {len(champions)} champions")
+
+
+def _preload_lore_champions() -> list:
+    setting = os.getenv("PRELOAD_LORE_CHAMPIONS", "").strip()
+    if not setting:
+        return []
+    if setting.lower() == "all":
+        return [role.value for role in Role if role.value not in _NON_CHAMPION_ROLES]
+    return [name.strip() for name in setting.split(",") if name.strip()]
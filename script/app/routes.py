@@ -1,18 +1,85 @@
-from flask import Blueprint, render_template, jsonify, request
+from flask import (
+    Blueprint, Response, render_template, jsonify, request, current_app,
+    send_file, stream_with_context, url_for
+)
+from app.database.preflight_cache import PreflightCache, get_preflight_cache
+from app.database.story_store import get_story_store
+from app.utils.core.http_caching import file_version
 from app.utils.core.logger import Logger
-from app.utils.core.story_teller import StoryTeller
+from app.utils.core.story_jobs import StoryCancelledError, StoryQueueFullError, story_fingerprint
+from app.utils.core.story_teller import StoryTeller, checkpoint_thread_id
+from app.utils.data_models.story_job_item import JobStatus, StoryJobItem
 from app.utils.data_models.story_teller_item import StoryTellerItem
 
+import asyncio
+import contextlib
+import json
+import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import google.generativeai as genai
+from app.utils.constants.models import get_gemini_model
+from app.utils.constants.roles import Role
 
 # Create a Blueprint named 'main'
 bp = Blueprint('main', __name__)
 
 @bp.route('/')
 def index():
-    return render_template('index.html')
+    return render_template(
+        'index.html',
+        champions_url=_catalog_url("champions"),
+        models_url=_catalog_url("models"),
+    )
+
+
+# -----------------------------
+# Catalogs
+# -----------------------------
+
+_CATALOGS = ("champions", "models")
+_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _catalog_path(name: str) -> str:
+    return os.path.join(current_app.static_folder, f"{name}.txt")
+
+
+def _catalog_url(name: str) -> str:
+    """
+    URL of a catalog, versioned by its content hash so that browsers may cache it for good.
+    """
+    path = _catalog_path(name)
+    if not os.path.isfile(path):
+        return url_for("main.get_catalog", name=name)
+    return url_for("main.get_catalog", name=name, v=file_version(path))
+
+
+@bp.route('/catalogs/<name>.txt', methods=['GET'])
+def get_catalog(name):
+    """
+    Serves the champion and model catalogs with a content-hash ETag and Last-Modified, so a
+    revalidation is answered with 304. A URL carrying the current version (see _catalog_url)
+    is cached as immutable; without it the catalog may be cached for CATALOG_MAX_AGE_SECONDS.
+    """
+    path = _catalog_path(name)
+    if name not in _CATALOGS or not os.path.isfile(path):
+        return jsonify({"success": False, "message": f"Unknown catalog '{name}'."}), 404
+
+    version = file_version(path)
+    versioned = request.args.get("v") == version
+    response = send_file(
+        path,
+        mimetype="text/plain",
+        etag=version,
+        conditional=True,
+        max_age=_IMMUTABLE_MAX_AGE if versioned else current_app.config["CATALOG_MAX_AGE_SECONDS"],
+    )
+    response.cache_control.public = True
+    if versioned:
+        response.cache_control.immutable = True
+    return response
 
 #testing purposes
 # @bp.route('/submit-data', methods=['POST'])
@@ -127,12 +194,19 @@ def receive_data():
 load_dotenv()  
 
 _GEMINI_MODEL_NAME = "gemini-2.0-flash-lite"  
-_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not _API_KEY:
-    raise RuntimeError("GOOGLE_API_KEY missing in environment")
 
-genai.configure(api_key=_API_KEY)
-_gemini_model = genai.GenerativeModel(_GEMINI_MODEL_NAME)
+log = logging.getLogger(__name__)
+
+
+def _gemini_model():
+    return get_gemini_model(_GEMINI_MODEL_NAME)
+
+
+# Preflight calls are independent of each other, so they share one executor and run concurrently
+_PREFLIGHT_TIMEOUT_SECONDS = float(os.getenv("PREFLIGHT_TIMEOUT_SECONDS", 20))
+_preflight_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PREFLIGHT_WORKERS", 8)), thread_name_prefix="preflight"
+)
 
 # -----------------------------
 # Simple validators
@@ -156,28 +230,11 @@ def _is_valid_personality(p: str) -> bool:
     return letters >= max(3, len(p2)//2)
 
 
-def _llm_refine_story_if_needed(story: str) -> dict:
+def _story_validation_result(story: str, refined: str) -> dict:
     """
-    Validates story and returns dict with validation info.
+    Compares the user's story with the LLM's version of it.
     Returns: {"valid": bool, "story": str, "feedback": str}
     """
-    prompt = f"""
-            You are validating a short scenario written by a user for a roleplay between League of Legends characters.
-
-            User input story:
-            \"\"\"{story}\"\"\"
-
-            Instructions:
-            1. If the user's input forms a coherent and meaningful sentence or phrase (even if short), RETURN IT EXACTLY as written — do NOT modify, paraphrase, or shorten it.
-            2. If the input appears to be a random sequence of letters, symbols, or an incomplete sentence fragment that lacks clear meaning,
-            then rewrite it into a simple, coherent, and complete scenario (1–2 sentences, under 50 words) suitable for a dialogue-driven scene.
-            3. DO NOT add new characters, names, world details, or filler content.
-            4. Output ONLY the final scenario text, with no commentary, quotes, or formatting.
-            """
-
-    resp = _gemini_model.generate_content(prompt)
-    refined = (resp.text or "").strip()
-    
     # Normalize for comparison (remove trailing punctuation)
     original_normalized = story.strip().rstrip('.,!?;:').lower()
     refined_normalized = refined.rstrip('.,!?;:').lower()
@@ -201,11 +258,84 @@ def _llm_refine_story_if_needed(story: str) -> dict:
         }
 
 
-def _llm_infer_personality_if_needed(champ_name: str, personality: str | None) -> str:
+def _clean_personality(text: str) -> str:
+    """
+    Keeps an LLM personality answer short; anything that fails the validator becomes "Neutral".
+    """
+    words = (text or "").strip().split()
+    inferred = " ".join(words[:3]) if words else "Neutral"
+    # As a guard, ensure it passes validator; otherwise pick "Neutral"
+    return inferred if _is_valid_personality(inferred) else "Neutral"
+
+
+def _story_cache_key(story: str) -> str:
+    return PreflightCache.make_key(" ".join(story.split()).lower())
+
+
+def _personality_cache_key(champ_name: str, personality) -> str:
+    raw = " ".join(personality.split()).lower() if isinstance(personality, str) else None
+    return PreflightCache.make_key(champ_name.lower(), raw)
+
+
+def _cached_story_validation(story: str):
+    """
+    Returns the cached validation result for this story, or None on a miss.
+    """
+    cached = get_preflight_cache().get("story", _story_cache_key(story))
+    if cached is not None and cached["valid"]:
+        # A valid story is always used exactly as this user wrote it
+        cached["story"] = story
+    return cached
+
+
+def _cache_story_validation(story: str, validation_result: dict):
+    get_preflight_cache().set("story", _story_cache_key(story), validation_result)
+
+
+def _llm_refine_story_if_needed(story: str, use_cache: bool = True) -> dict:
+    """
+    Validates story and returns dict with validation info.
+    Returns: {"valid": bool, "story": str, "feedback": str}
+    Answers are cached by the normalized story; pass use_cache=False if the caller already looked it up.
+    """
+    if use_cache:
+        cached = _cached_story_validation(story)
+        if cached is not None:
+            return cached
+
+    prompt = f"""
+            You are validating a short scenario written by a user for a roleplay between League of Legends characters.
+
+            User input story:
+            \"\"\"{story}\"\"\"
+
+            Instructions:
+            1. If the user's input forms a coherent and meaningful sentence or phrase (even if short), RETURN IT EXACTLY as written — do NOT modify, paraphrase, or shorten it.
+            2. If the input appears to be a random sequence of letters, symbols, or an incomplete sentence fragment that lacks clear meaning,
+            then rewrite it into a simple, coherent, and complete scenario (1–2 sentences, under 50 words) suitable for a dialogue-driven scene.
+            3. DO NOT add new characters, names, world details, or filler content.
+            4. Output ONLY the final scenario text, with no commentary, quotes, or formatting.
+            """
+
+    resp = _gemini_model().generate_content(prompt)
+    refined = (resp.text or "").strip()
+    validation_result = _story_validation_result(story, refined)
+    _cache_story_validation(story, validation_result)
+    return validation_result
+
+
+def _llm_infer_personality_if_needed(champ_name: str, personality: str | None, use_cache: bool = True) -> str:
     """
     If provided personality is valid -> return unchanged.
     If missing/invalid -> ask Gemini for the canonical/dominant personality of {champ_name} in LoL.
+    Answers are cached by champion name and normalized personality; pass use_cache=False if the
+    caller already looked it up.
     """
+    cache_key = _personality_cache_key(champ_name, personality)
+    if use_cache:
+        cached = get_preflight_cache().get("personality", cache_key)
+        if cached is not None:
+            return cached
     
     prompt = f"""
             Champion name: \"\"\"{champ_name}\"\"\"
@@ -221,38 +351,287 @@ def _llm_infer_personality_if_needed(champ_name: str, personality: str | None) -
             4. Return ONLY the final personality text — no quotes, commentary, punctuation, or extra words.
             """
 
-    resp = _gemini_model.generate_content(prompt)
-    text = (resp.text or "").strip()
+    resp = _gemini_model().generate_content(prompt)
     # Final cleanup: keep it short
-    words = text.split()
-    inferred = " ".join(words[:3]) if words else "Neutral"
-    # As a guard, ensure it passes validator; otherwise pick "Neutral"
-    final_p = inferred if _is_valid_personality(inferred) else "Neutral"
+    final_p = _clean_personality(resp.text)
+    get_preflight_cache().set("personality", cache_key, final_p)
     return final_p
 
 
-@bp.route('/submit-data', methods=['POST'])
-def receive_data():
-    if not request.is_json:
-        return jsonify({"success": False, "message": "Expected application/json body"}), 400
+def _llm_preflight(story: str, champions: list) -> tuple:
+    """
+    Validates the story and resolves every champion's personality with a single structured
+    (JSON) Gemini call instead of one call for the story plus one per champion.
 
-    data = request.get_json(silent=True) or {}
+    Args:
+        story: The user's story
+        champions: List of (champion name, user-provided personality or None)
+
+    Returns:
+        (validation_result, {champion name: personality}); validation_result has the same
+        shape as _llm_refine_story_if_needed. If the response cannot be parsed, falls back to
+        the separate calls; a champion missing from the response falls back to its own call.
+
+    Cached answers are used first, and only what is missing is asked for. The whole preflight,
+    fallbacks included, shares one PREFLIGHT_TIMEOUT_SECONDS deadline.
+    """
+    deadline = time.monotonic() + _PREFLIGHT_TIMEOUT_SECONDS
+    validation_result, personalities, uncached = _cached_preflight(story, champions)
+    if validation_result is not None:
+        if uncached:
+            personalities.update(_llm_infer_personalities(uncached, deadline, use_cache=False))
+        return validation_result, personalities
+
+    future = _preflight_executor.submit(
+        _gemini_model().generate_content, _preflight_prompt(story, uncached), **_preflight_call_options(deadline)
+    )
+    try:
+        resp = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        refined, missing = _apply_preflight_response(resp.text, uncached, personalities)
+    except Exception as e:
+        future.cancel()
+        log.warning("Batched preflight failed or timed out, falling back to separate calls: %r", e)
+        validation_result, inferred = _llm_preflight_separately(story, uncached, use_cache=False, deadline=deadline)
+        return validation_result, {**personalities, **inferred}
+
+    if missing:
+        personalities.update(_llm_infer_personalities(missing, deadline, use_cache=False))
+
+    validation_result = _story_validation_result(story, refined)
+    _cache_story_validation(story, validation_result)
+    return validation_result, personalities
+
+
+async def _allm_preflight(story: str, champions: list) -> tuple:
+    """
+    Async version of _llm_preflight: the batched call runs on the preflight executor and is awaited.
+    The rarely needed fallbacks reuse the threaded per-field calls.
+
+    The SDK's async client is bound to the event loop that created it, and every async request
+    (and every async job) runs on a new loop, so the cached model is only used synchronously.
+    """
+    deadline = time.monotonic() + _PREFLIGHT_TIMEOUT_SECONDS
+    validation_result, personalities, uncached = _cached_preflight(story, champions)
+    if validation_result is not None:
+        if uncached:
+            personalities.update(
+                await asyncio.to_thread(_llm_infer_personalities, uncached, deadline, False)
+            )
+        return validation_result, personalities
+
+    try:
+        # On the preflight executor rather than the loop's: a hung call must not hold up the loop's shutdown
+        future = _preflight_executor.submit(
+            _gemini_model().generate_content, _preflight_prompt(story, uncached), **_preflight_call_options(deadline)
+        )
+        resp = await asyncio.wait_for(asyncio.wrap_future(future), timeout=max(0.0, deadline - time.monotonic()))
+        refined, missing = _apply_preflight_response(resp.text, uncached, personalities)
+    except Exception as e:
+        log.warning("Batched preflight failed or timed out, falling back to separate calls: %r", e)
+        validation_result, inferred = await asyncio.to_thread(
+            _llm_preflight_separately, story, uncached, False, deadline
+        )
+        return validation_result, {**personalities, **inferred}
+
+    if missing:
+        personalities.update(
+            await asyncio.to_thread(_llm_infer_personalities, missing, deadline, False)
+        )
+
+    validation_result = _story_validation_result(story, refined)
+    _cache_story_validation(story, validation_result)
+    return validation_result, personalities
+
+
+def _preflight_call_options(deadline: float) -> dict:
+    """
+    Options of the batched preflight call: a JSON answer, and a request timeout matching the
+    deadline so that a hung call does not keep its thread once nobody waits for it anymore.
+    """
+    return {
+        "generation_config": {"response_mime_type": "application/json"},
+        "request_options": {"timeout": max(1.0, deadline - time.monotonic())},
+    }
+
+
+def _cached_preflight(story: str, champions: list) -> tuple:
+    """
+    Looks up the story validation and every personality in the preflight cache.
+    Returns (validation_result or None, {name: personality} found, [(name, personality)] not found).
+    """
+    cache = get_preflight_cache()
+    validation_result = _cached_story_validation(story)
+    personalities = {}
+    uncached = []
+    for name, personality in champions:
+        cached = cache.get("personality", _personality_cache_key(name, personality))
+        if cached is not None:
+            personalities[name] = cached
+        else:
+            uncached.append((name, personality))
+    return validation_result, personalities, uncached
+
+
+def _preflight_prompt(story: str, champions: list) -> str:
+    champion_lines = "\n".join(
+        f"            - {name}: \"\"\"{personality}\"\"\"" for name, personality in champions
+    )
+    return f"""
+            You are preparing a roleplay between League of Legends characters. Validate the user's scenario
+            and resolve the personality of every champion.
+
+            User input story:
+            \"\"\"{story}\"\"\"
+
+            Champions and their user-provided personalities:
+{champion_lines}
+
+            Story instructions:
+            1. If the user's input forms a coherent and meaningful sentence or phrase (even if short), RETURN IT EXACTLY as written — do NOT modify, paraphrase, or shorten it.
+            2. If the input appears to be a random sequence of letters, symbols, or an incomplete sentence fragment that lacks clear meaning,
+            then rewrite it into a simple, coherent, and complete scenario (1–2 sentences, under 50 words) suitable for a dialogue-driven scene.
+            3. DO NOT add new characters, names, world details, or filler content.
+
+            Personality instructions (for each champion separately):
+            1. If the user's input for personality is a meaningful English word or short phrase that could describe a personality
+            (e.g., "calm", "brave", "arrogant", "determined"), KEEP IT EXACTLY as written — do not paraphrase, reword, or modify it.
+            2. Only if the user's input is 'None', or a random sequence of letters/symbols (nonsensical),
+            then replace it by inferring the champion's dominant personality from League of Legends lore.
+            3. When inferring, use 1–2 adjectives that best describe the champion's typical personality
+            (e.g., "Stoic", "Cunning", "Honorable", "Vengeful").
+
+            Output ONLY a JSON object of this exact shape, using the champion names exactly as listed:
+            {{"story": "<final scenario text>", "personalities": {{"<champion name>": "<final personality>"}}}}
+            """
+
+
+def _apply_preflight_response(text: str, champions: list, personalities: dict) -> tuple:
+    """
+    Parses the batched preflight answer and stores every returned personality in `personalities`
+    and in the cache. Raises ValueError if the answer is unusable.
+    Returns (refined story, [(name, personality)] the answer did not cover).
+    """
+    parsed = json.loads(text or "")
+    refined = str(parsed["story"]).strip()
+    returned_personalities = parsed.get("personalities") or {}
+    if not refined or not isinstance(returned_personalities, dict):
+        raise ValueError("incomplete preflight response")
+
+    cache = get_preflight_cache()
+    missing = []
+    for name, raw_personality in champions:
+        inferred = returned_personalities.get(name)
+        if isinstance(inferred, str) and inferred.strip():
+            personalities[name] = _clean_personality(inferred)
+            cache.set("personality", _personality_cache_key(name, raw_personality), personalities[name])
+        else:
+            missing.append((name, raw_personality))
+    return refined, missing
+
+
+def _await_preflight_call(future, deadline: float, fallback, label: str):
+    """
+    Waits for a preflight call until the shared deadline; on timeout or error returns the fallback.
+    """
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except Exception as e:
+        future.cancel()
+        log.warning("Preflight %s failed or timed out, using fallback: %r", label, e)
+        return fallback
+
+
+def _llm_infer_personalities(champions: list, deadline: float = None, use_cache: bool = True) -> dict:
+    """
+    Runs _llm_infer_personality_if_needed for every (name, personality) concurrently.
+    A call that fails or exceeds the timeout resolves to "Neutral".
+    """
+    deadline = deadline or time.monotonic() + _PREFLIGHT_TIMEOUT_SECONDS
+    futures = {
+        name: _preflight_executor.submit(_llm_infer_personality_if_needed, name, personality, use_cache)
+        for name, personality in champions
+    }
+    return {
+        name: _await_preflight_call(future, deadline, "Neutral", f"personality of {name}")
+        for name, future in futures.items()
+    }
+
+
+def _llm_preflight_separately(
+    story: str, champions: list, use_cache: bool = True, deadline: float = None
+) -> tuple:
+    """
+    Same result as _llm_preflight, but with one call for the story and one per champion.
+    The calls do not depend on each other, so they are fanned out on the preflight executor
+    and the whole phase costs about one round trip. A story validation that fails or times out
+    asks the user to retry. `deadline` (time.monotonic()) defaults to PREFLIGHT_TIMEOUT_SECONDS from now.
+    """
+    deadline = deadline or time.monotonic() + _PREFLIGHT_TIMEOUT_SECONDS
+    story_future = _preflight_executor.submit(_llm_refine_story_if_needed, story, use_cache)
+    personalities = _llm_infer_personalities(champions, deadline, use_cache)
+    validation_result = _await_preflight_call(
+        story_future,
+        deadline,
+        {
+            "valid": False,
+            "story": story,
+            "feedback": "We could not validate your story in time, please submit it again."
+        },
+        "story validation",
+    )
+    return validation_result, personalities
+
+
+def _preflight_story_request(data: dict):
+    """
+    Validates the story and resolves every champion's name, personality and model.
+    Returns (error_response, None) when the client has to be answered right away,
+    otherwise (None, prepared) where prepared holds the inputs for the StoryTeller.
+    """
+    error_response, request_fields = _parse_story_request(data)
+    if error_response is not None:
+        return error_response, None
+
+    validation_result, personalities = _llm_preflight(
+        request_fields["story"], [(c["name"], c["personality"]) for c in request_fields["champions"]]
+    )
+    return _finish_preflight(request_fields, validation_result, personalities)
+
+
+async def _apreflight_story_request(data: dict):
+    """
+    Async version of _preflight_story_request.
+    """
+    error_response, request_fields = _parse_story_request(data)
+    if error_response is not None:
+        return error_response, None
+
+    validation_result, personalities = await _allm_preflight(
+        request_fields["story"], [(c["name"], c["personality"]) for c in request_fields["champions"]]
+    )
+    return _finish_preflight(request_fields, validation_result, personalities)
+
+
+def _parse_story_request(data: dict):
+    """
+    Checks the request body and resolves every champion's name and model; needs no LLM.
+    Returns (error_response, None) or (None, {"story", "retry_count", "champions"}).
+    """
     story = data.get("story")
     characters = data.get("characters")
     retry_count = data.get("retry_count", 0)  # Track retry attempts
 
     if not story or not isinstance(characters, list) or not characters:
-        return jsonify({
+        return (jsonify({
             "success": False,
             "message": "Body must include 'story' (str) and non-empty 'characters' (list)."
-        }), 400
+        }), 400), None
 
     MODEL_ALIASES = {
         "gemini-2.5-flash": "gemini_2_5_flash_lite",
         "gemini-2.0-flash": "gemini_2_0_flash_lite",
     }
     DEFAULT_MODEL = "gemini_2_5_flash_lite"
-    DEFAULT_PERSONALITY = "Neutral"  
 
     def normalize_model(m):
         if not m:
@@ -262,47 +641,18 @@ def receive_data():
             return MODEL_ALIASES[m_lower]
         return "".join(ch if ch.isalnum() else "_" for ch in m_lower)
 
-    # Story: validate and check if user input is valid
-    validation_result = _llm_refine_story_if_needed(story)
-    
-    # If invalid and under 3 retries, ask user to retry
-    if not validation_result["valid"] and retry_count < 3:
-        return jsonify({
-            "success": False,
-            "needs_retry": True,
-            "retry_count": retry_count + 1,
-            "feedback": validation_result["feedback"],
-            "message": "Please provide a valid story outline."
-        }), 200
-    
-    # After 3 retries or if valid, proceed with story generation
-    if retry_count >= 3 and not validation_result["valid"]:
-        # Use LLM-generated story after max retries
-        story_validated = validation_result["story"]
-        auto_generated = True
-        story_is_valid = False
-        print(f"Max retries reached. Using LLM-generated story: {story_validated}")
-    else:
-        # Use original valid story
-        story_validated = validation_result["story"]
-        auto_generated = False
-        story_is_valid = validation_result["valid"]
-
+    # Names and models need no LLM, check them before paying for the preflight call
     champions = []
     for c in characters:
         name = c.get("name")
         if not name or not isinstance(name, str) or not name.strip():
-            return jsonify({"success": False, "message": "Each character needs a non-empty 'name'."}), 400
+            return (jsonify({"success": False, "message": "Each character needs a non-empty 'name'."}), 400), None
         clean_name = (
             name.replace("'", "")    
                 .replace("’", "")    
                 .replace(" ", "")   
                 .strip()
         )
-        name = clean_name
-        # Personality: use LLM only if missing/invalid
-        raw_personality = c.get("personality")
-        personality_final = _llm_infer_personality_if_needed(name, raw_personality) or DEFAULT_PERSONALITY
 
         models = c.get("models")
         if isinstance(models, list):
@@ -312,10 +662,48 @@ def receive_data():
             model_value = normalize_model(models)
 
         champions.append({
-            "name": name,
-            "personality": personality_final,  
+            "name": clean_name,
+            "personality": c.get("personality"),
             "models": model_value
         })
+
+    return None, {"story": story, "retry_count": retry_count, "champions": champions}
+
+
+def _finish_preflight(request_fields: dict, validation_result: dict, personalities: dict):
+    """
+    Applies the preflight answers to a parsed request.
+    Story and personalities come from one structured LLM call, personalities only change if
+    missing/invalid. Returns the same as _preflight_story_request.
+    """
+    DEFAULT_PERSONALITY = "Neutral"
+    retry_count = request_fields["retry_count"]
+    champions = request_fields["champions"]
+    for c in champions:
+        c["personality"] = personalities.get(c["name"]) or DEFAULT_PERSONALITY
+    
+    # If invalid and under 3 retries, ask user to retry
+    if not validation_result["valid"] and retry_count < 3:
+        return (jsonify({
+            "success": False,
+            "needs_retry": True,
+            "retry_count": retry_count + 1,
+            "feedback": validation_result["feedback"],
+            "message": "Please provide a valid story outline."
+        }), 200), None
+    
+    # After 3 retries or if valid, proceed with story generation
+    if retry_count >= 3 and not validation_result["valid"]:
+        # Use LLM-generated story after max retries
+        story_validated = validation_result["story"]
+        auto_generated = True
+        story_is_valid = False
+        print(f"Max retries reached. Using LLM-generated story: {story_validated}")
+    else:
+        # Use original valid story
+        story_validated = validation_result["story"]
+        auto_generated = False
+        story_is_valid = validation_result["valid"]
     
     print(f"\n{'='*80}")
     print(f"Story validated: {story_validated}")
@@ -325,32 +713,604 @@ def receive_data():
     
     # If auto-generated, return the generated story to frontend for review
     if auto_generated:
-        return jsonify({
+        return (jsonify({
             "success": False,
             "auto_generated": True,
             "generated_story": story_validated,
             "message": "Maximum retry attempts reached. We generated a story for you based on your input.",
             "champions_used": champions
-        }), 200
-    
+        }), 200), None
+
+    return None, {
+        "scenario": story_validated,
+        "champions": champions,
+        "story_was_valid": story_is_valid,
+    }
+
+
+def _build_story_teller(prepared: dict, story_id: str = None) -> StoryTeller:
+    """
+    Creates the StoryTeller for a preflighted request and builds its graph.
+    """
     logger = Logger()
     story_teller = StoryTeller(
         StoryTellerItem(
-            scenario=story_validated,
-            champions=champions,
-            logger=logger
+            scenario=prepared["scenario"],
+            champions=prepared["champions"],
+            logger=logger,
+            lore=prepared.get("lore"),
+            deadline=prepared.get("deadline"),
+            story_id=story_id,
+            checkpointer=prepared.get("checkpointer"),
         )
     )
 
     assert story_teller is not None
     story_teller.build_graph()
-    result = story_teller.invoke()
+    return story_teller
+
+
+def _generate_story(job: StoryJobItem, prepared: dict) -> dict:
+    """
+    Job function: builds the StoryTeller for a preflighted request and runs it, publishing every
+    frame of StoryTeller.stream to the job as soon as it is produced.
+    Returns the story part of the /submit-data response.
+
+    A cancelled job stops between two graph nodes; what was played so far stays in the checkpoint,
+    from where a resumed job (prepared["resume"], see resume_story) continues.
+    """
+    story = _start_story(job, prepared)
+
+    result = None
+    with _interrupted_on_exit(job):
+        story_teller = _build_story_teller(prepared, job.job_id)
+        _save_unfinished_story(job, prepared, story, story_teller.lore)
+        with contextlib.closing(story_teller.stream(resume=prepared.get("resume", False))) as frames:
+            for frame_type, payload in frames:
+                job.publish(frame_type, payload)
+                if frame_type == "done":
+                    result = payload
+                elif job.cancel_requested:
+                    raise StoryCancelledError()
+
+    return _finish_story(job, prepared, story, result)
+
+
+async def _agenerate_story(job: StoryJobItem, prepared: dict) -> dict:
+    """
+    Async version of _generate_story, used when the job manager runs stories on its event loop.
+    The champions' lore is summarized concurrently and every LLM call is awaited. Besides the
+    checks between nodes, cancelling the job cancels its task, aborting the LLM call in flight.
+    """
+    story = await asyncio.to_thread(_start_story, job, prepared)
+
+    result = None
+    with _interrupted_on_exit(job):
+        story_teller = await StoryTeller.acreate(
+            StoryTellerItem(
+                scenario=prepared["scenario"],
+                champions=prepared["champions"],
+                logger=Logger(),
+                lore=prepared.get("lore"),
+                deadline=prepared.get("deadline"),
+                story_id=job.job_id,
+                checkpointer=prepared.get("checkpointer"),
+            )
+        )
+        await asyncio.to_thread(_save_unfinished_story, job, prepared, story, story_teller.lore)
+        async with contextlib.aclosing(story_teller.astream(resume=prepared.get("resume", False))) as frames:
+            async for frame_type, payload in frames:
+                job.publish(frame_type, payload)
+                if frame_type == "done":
+                    result = payload
+                elif job.cancel_requested:
+                    raise StoryCancelledError()
+
+    return await asyncio.to_thread(_finish_story, job, prepared, story, result)
+
+
+def _start_story(job: StoryJobItem, prepared: dict) -> dict:
+    story = {
+        "scenario_used": prepared["scenario"],
+        "champions_used": prepared["champions"],
+        "story_was_valid": prepared["story_was_valid"],
+        # Where the story's graph state is checkpointed
+        "thread_id": checkpoint_thread_id(job.job_id),
+    }
+    # Published before the StoryTeller is built, so followers get a frame before lore summarization
+    job.publish("start", {"job_id": job.job_id, **story})
+    _save_unfinished_story(job, prepared, story, prepared.get("lore"))
+    return story
+
+
+def _save_unfinished_story(job: StoryJobItem, prepared: dict, story: dict, lore: dict):
+    """
+    Records the story as running with what resume_story needs to continue it: the preflighted
+    request and the summarized lore, which then is not summarized again.
+    """
+    try:
+        get_story_store().save_unfinished(job.job_id, {
+            "prepared": {key: prepared[key] for key in ("scenario", "champions", "story_was_valid")},
+            "story": story,
+            "fingerprint": job.fingerprint,
+            "lore": lore,
+        }, idempotency_key=job.idempotency_key)
+    except Exception as e:
+        print(f"Could not record story {job.job_id} as running, it cannot be resumed: {e}")
+
+
+@contextlib.contextmanager
+def _interrupted_on_exit(job: StoryJobItem):
+    """
+    Marks the story as interrupted in the story store when its run stops early (an error, a
+    cancellation), so that it can be resumed at once.
+    """
+    try:
+        yield
+    except BaseException:
+        try:
+            get_story_store().mark_interrupted(job.job_id)
+        except Exception as e:
+            print(f"Could not mark story {job.job_id} as interrupted: {e}")
+        raise
+
+
+def _finish_story(job: StoryJobItem, prepared: dict, story: dict, result: dict) -> dict:
+    story = {"story_id": job.job_id, "result": result, **story}
+    # Keep the paid-for story so it can be served again without regenerating it
+    try:
+        get_story_store().save(
+            job.job_id,
+            prepared["scenario"],
+            prepared["champions"],
+            story,
+            fingerprint=job.fingerprint,
+            idempotency_key=job.idempotency_key,
+        )
+    except Exception as e:
+        print(f"Could not store story {job.job_id}: {e}")
+    return story
+
+
+def _job_from_stored_story(
+    jobs, story_id: str, story: dict, fingerprint: str, idempotency_key: str = None
+) -> StoryJobItem:
+    """
+    Wraps a story from the story store into a finished job, with the frames a fresh run would
+    have started and ended with. `idempotency_key`, if given, then names that job.
+    """
+    start = {key: value for key, value in story.items() if key not in ("story_id", "result")}
+    return jobs.add_finished(
+        story_id,
+        story,
+        [("start", {"job_id": story_id, **start}), ("done", story.get("result"))],
+        fingerprint=fingerprint,
+        idempotency_key=idempotency_key,
+    )
+
+
+def _submit_story(data: dict):
+    """
+    Runs the preflight and queues the story on the story worker pool.
+
+    Duplicate submissions do not start a second run: a request carrying an idempotency key
+    (Idempotency-Key header or 'idempotency_key' field) that was already seen attaches to that
+    job before any preflight call, and a request whose content fingerprint matches a queued,
+    running or recently finished job (in this process or in the story store) attaches to it.
+    Idempotency keys are stored with the stories, so a retry reaching another worker process
+    gets the finished story, or a 409 while it is still running there.
+
+    New stories are admitted per client (see StoryJobManager): when the wait queue or the
+    client's share of it is full, the request is answered with 429 and a Retry-After header,
+    checked before the preflight so a rejected request costs no LLM call.
+
+    Returns (error_response, None) or (None, job).
+    """
+    answer, admission = _admit_story_request(data)
+    if answer is not None:
+        return answer
+
+    error_response, prepared = _preflight_story_request(data)
+    if error_response is not None:
+        return error_response, None
+    return _queue_story(prepared, admission)
+
+
+async def _asubmit_story(data: dict):
+    """
+    Async version of _submit_story; the preflight call is awaited.
+    """
+    answer, admission = _admit_story_request(data)
+    if answer is not None:
+        return answer
+
+    error_response, prepared = await _apreflight_story_request(data)
+    if error_response is not None:
+        return error_response, None
+    return _queue_story(prepared, admission)
+
+
+def _admit_story_request(data: dict):
+    """
+    Checks everything that needs no preflight: an already seen idempotency key and admission.
+    Returns ((error_response, job), None) if the request is answered already,
+    otherwise (None, admission) with what _queue_story needs.
+    """
+    jobs = current_app.extensions["story_jobs"]
+    idempotency_key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+    if idempotency_key:
+        job = jobs.find(idempotency_key=idempotency_key)
+        if job is not None:
+            return (None, job), None
+        answer = _stored_idempotent_answer(jobs, idempotency_key)
+        if answer is not None:
+            return answer, None
+
+    client_id = _client_id()
+    try:
+        jobs.check_admission(client_id)
+    except StoryQueueFullError as e:
+        return (_queue_full_response(e), None), None
+
+    return None, {"client_id": client_id, "idempotency_key": idempotency_key}
+
+
+def _stored_idempotent_answer(jobs, idempotency_key: str):
+    """
+    Looks an idempotency key unknown to this process up in the story store, for a request retried
+    on another worker process. Returns (error_response, job) like _submit_story, or None if the key
+    names no story that is finished or still running.
+    """
+    try:
+        stored = get_story_store().find_by_idempotency_key(idempotency_key)
+    except Exception as e:
+        print(f"Could not look up idempotency key in the story store: {e}")
+        return None
+    if stored is None:
+        return None
+    if stored["finished"]:
+        return None, _job_from_stored_story(
+            jobs, stored["story_id"], stored["story"], stored["fingerprint"], idempotency_key
+        )
+
+    # Like resume_story, a record still running after STORY_RESUME_AFTER_SECONDS has lost its worker
+    running_for = time.time() - stored["updated_at"]
+    if stored["status"] == "running" and running_for < current_app.config["STORY_RESUME_AFTER_SECONDS"]:
+        return (jsonify({
+            "success": False,
+            "message": "A story with this idempotency key is still running in another worker.",
+            "job_id": stored["story_id"],
+        }), 409), None
+    return None
+
+
+def _queue_story(prepared: dict, admission: dict):
+    jobs = current_app.extensions["story_jobs"]
+    fingerprint = story_fingerprint(prepared["scenario"], prepared["champions"])
+    if jobs.find(fingerprint=fingerprint) is None:
+        # Another worker may already have finished the same story
+        stored = get_story_store().find_recent(fingerprint, jobs.dedupe_window)
+        if stored is not None:
+            return None, _job_from_stored_story(jobs, *stored, fingerprint, admission["idempotency_key"])
+
+    try:
+        job = jobs.submit(
+            _agenerate_story if jobs.run_async else _generate_story,
+            {
+                **prepared,
+                "deadline": _story_deadline(),
+                "checkpointer": current_app.config["STORY_CHECKPOINTER"],
+            },
+            fingerprint=fingerprint,
+            **admission,
+        )
+    except StoryQueueFullError as e:
+        return _queue_full_response(e), None
+
+    return None, job
+
+
+def _story_deadline():
+    """
+    Epoch seconds by which a story submitted now should start wrapping up: STORY_DEADLINE_SECONDS
+    from now, minus the time kept for the NovelWriterBot. Time spent waiting in the queue counts.
+    None if no deadline is configured.
+    """
+    budget = current_app.config["STORY_DEADLINE_SECONDS"]
+    if budget <= 0:
+        return None
+    return time.time() + max(0.0, budget - current_app.config["STORY_DEADLINE_RESERVE_SECONDS"])
+
+
+def _client_id() -> str:
+    """
+    Identifies the submitting client for fair queueing: the X-Client-Id header if set,
+    otherwise the remote address.
+    """
+    return request.headers.get("X-Client-Id") or request.remote_addr or "anonymous"
+
+
+def _queue_full_response(error: StoryQueueFullError):
+    return (
+        jsonify({"success": False, "message": str(error), "retry_after": error.retry_after}),
+        429,
+        {"Retry-After": str(error.retry_after)},
+    )
+
+
+@bp.route('/submit-data', methods=['POST'])
+def receive_data():
+    if not request.is_json:
+        return jsonify({"success": False, "message": "Expected application/json body"}), 400
+
+    data = request.get_json(silent=True) or {}
+    error_response, job = _submit_story(data)
+    if error_response is not None:
+        return error_response
+
+    timeout = current_app.config["STORY_WAIT_TIMEOUT_SECONDS"]
+    if not job.wait(timeout=timeout if timeout > 0 else None):
+        return jsonify({
+            "success": False,
+            "message": f"Story not finished after {timeout:g} seconds; it keeps running.",
+            "job_id": job.job_id,
+            "status_url": url_for("main.get_job", job_id=job.job_id),
+        }), 504
+    if job.status == JobStatus.failed:
+        return jsonify({"success": False, "message": job.error, "job_id": job.job_id}), 500
+    if job.status == JobStatus.cancelled:
+        return jsonify({"success": False, "message": "Story was cancelled.", "job_id": job.job_id}), 409
 
     return jsonify({
         "success": True,
         "message": "Payload processed",
-        "result": result,
-        "scenario_used": story_validated,
-        "champions_used": champions,
-        "story_was_valid": story_is_valid
-    }), 200
\ No newline at end of file
+        "job_id": job.job_id,
+        **job.result
+    }), 200
+
+
+def _sse_frame(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@bp.route('/submit-data/stream', methods=['POST'])
+def receive_data_stream():
+    """
+    Same contract as /submit-data, but once the preflight passes the story is sent back
+    as Server-Sent Events while the graph runs. Preflight answers (errors, retries,
+    auto-generated stories) are still plain JSON.
+    A duplicate submission replays the frames of the original run and then follows it live.
+    When the client disconnects and nobody else follows the story, the story is cancelled.
+    """
+    if not request.is_json:
+        return jsonify({"success": False, "message": "Expected application/json body"}), 400
+
+    data = request.get_json(silent=True) or {}
+    error_response, job = _submit_story(data)
+    if error_response is not None:
+        return error_response
+
+    jobs = current_app.extensions["story_jobs"]
+
+    def generate():
+        # Closed by the server when the client goes away, which lets follow() cancel the story
+        for frame_type, payload in jobs.follow(job):
+            yield _sse_frame(frame_type, payload)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -----------------------------
+# Job API
+# -----------------------------
+
+
+@bp.route('/jobs', methods=['POST'])
+async def submit_job():
+    """
+    Same contract as /submit-data, but the story is queued on the story worker pool
+    and a job id is returned right away. Poll GET /jobs/<job_id> for the result.
+    Nothing here waits on the story, so the view is async and only awaits the preflight call.
+    """
+    if not request.is_json:
+        return jsonify({"success": False, "message": "Expected application/json body"}), 400
+
+    data = request.get_json(silent=True) or {}
+    error_response, job = await _asubmit_story(data)
+    if error_response is not None:
+        return error_response
+
+    return jsonify({
+        "success": True,
+        "message": "Story queued",
+        "job_id": job.job_id,
+        "status": job.status.value,
+        "status_url": url_for("main.get_job", job_id=job.job_id),
+    }), 202
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = current_app.extensions["story_jobs"].get(job_id)
+    if job is None:
+        # With several worker processes the job may have run in another one; the story id is
+        # the job id, so a finished story is found in the shared story store
+        story = get_story_store().get(job_id)
+        if story is None:
+            return jsonify({"success": False, "message": f"Unknown job '{job_id}'."}), 404
+        story.pop("completed_at", None)
+        job = _job_from_stored_story(current_app.extensions["story_jobs"], job_id, story, None)
+
+    return jsonify({"success": True, **job.to_dict()}), 200
+
+
+@bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancels a story: a queued story never runs, a running one stops before its next graph node
+    (202 until it has). Only jobs of this worker process can be cancelled.
+    """
+    job = current_app.extensions["story_jobs"].cancel(job_id)
+    if job is None:
+        if get_story_store().get(job_id) is not None:
+            return jsonify({"success": False, "message": f"Job '{job_id}' already finished."}), 409
+        return jsonify({"success": False, "message": f"Unknown job '{job_id}'."}), 404
+    if job.is_finished and job.status != JobStatus.cancelled:
+        return jsonify({"success": False, "message": f"Job '{job_id}' already finished.", **job.to_dict()}), 409
+
+    return jsonify({"success": True, **job.to_dict()}), 200 if job.is_finished else 202
+
+
+# -----------------------------
+# Stored stories
+# -----------------------------
+
+
+@bp.route('/stories', methods=['GET'])
+def list_stories():
+    """
+    Paginated listing of finished stories, newest first: ?page=<n>&per_page=<n> (max 100).
+    """
+    page = max(1, request.args.get("page", 1, type=int))
+    per_page = min(100, max(1, request.args.get("per_page", 20, type=int)))
+    stories, total = get_story_store().list(page=page, per_page=per_page)
+
+    return jsonify({
+        "success": True,
+        "stories": stories,
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": (total + per_page - 1) // per_page,
+    }), 200
+
+
+@bp.route('/stories/<story_id>', methods=['GET'])
+def get_story(story_id):
+    story = get_story_store().get(story_id)
+    if story is None:
+        return jsonify({"success": False, "message": f"Unknown story '{story_id}'."}), 404
+
+    return jsonify({"success": True, **story}), 200
+
+
+@bp.route('/stories/<story_id>/resume', methods=['POST'])
+def resume_story(story_id):
+    """
+    Continues a story that did not finish (its worker died, an LLM call failed, it was cancelled)
+    from its last checkpoint, on the story worker pool like POST /jobs: the graph nodes that
+    completed and the lore summaries are not run again. The story keeps its id, poll
+    GET /jobs/<story_id> for the result.
+
+    A story still recorded as running is only resumed after STORY_RESUME_AFTER_SECONDS, since
+    it may be running in another worker process.
+    """
+    jobs = current_app.extensions["story_jobs"]
+    checkpointer = current_app.config["STORY_CHECKPOINTER"]
+    if checkpointer in ("none", "memory"):
+        return jsonify({
+            "success": False,
+            "message": f"Stories cannot be resumed with STORY_CHECKPOINTER={checkpointer}.",
+        }), 409
+
+    job = jobs.get(story_id)
+    if job is None or job.is_finished:
+        if get_story_store().get(story_id) is not None:
+            return jsonify({"success": False, "message": f"Story '{story_id}' already finished."}), 409
+
+        unfinished = get_story_store().get_unfinished(story_id)
+        if unfinished is None:
+            return jsonify({"success": False, "message": f"Unknown story '{story_id}'."}), 404
+        running_for = time.time() - unfinished["updated_at"]
+        if unfinished["status"] == "running" and running_for < current_app.config["STORY_RESUME_AFTER_SECONDS"]:
+            return jsonify({"success": False, "message": f"Story '{story_id}' may still be running."}), 409
+
+        try:
+            job = jobs.submit(
+                _agenerate_story if jobs.run_async else _generate_story,
+                {
+                    **unfinished["prepared"],
+                    "lore": unfinished["lore"],
+                    "deadline": _story_deadline(),
+                    "checkpointer": checkpointer,
+                    "resume": True,
+                },
+                fingerprint=unfinished["fingerprint"],
+                idempotency_key=unfinished["idempotency_key"],
+                client_id=_client_id(),
+                job_id=story_id,
+                # A new job for the same prompt (e.g. a retry after the failure) is another story
+                dedupe=False,
+            )
+        except StoryQueueFullError as e:
+            return _queue_full_response(e)
+
+    return jsonify({
+        "success": True,
+        "message": "Story resumed",
+        "job_id": job.job_id,
+        "status": job.status.value,
+        "status_url": url_for("main.get_job", job_id=job.job_id),
+    }), 202
+
+
+@bp.route('/preflight/cache-stats', methods=['GET'])
+def preflight_cache_stats():
+    return jsonify({"success": True, **get_preflight_cache().stats()}), 200
+
+
+# -----------------------------
+# Health
+# -----------------------------
+
+
+@bp.route('/healthz', methods=['GET'])
+def healthz():
+    """
+    Liveness: the process is up and serving requests.
+    """
+    return jsonify({"success": True, "status": "ok"}), 200
+
+
+@bp.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness: 200 once this worker's warm-up is done, 503 while it is still warming up.
+    """
+    warmup = current_app.extensions["warmup"]
+    return jsonify({"success": warmup.ready, **warmup.to_dict()}), 200 if warmup.ready else 503
+
+
+# -----------------------------
+# Debug
+# -----------------------------
+
+
+@bp.route('/debug/graph', methods=['GET'])
+def get_graph_diagram():
+    """
+    Diagram of the story graph for a cast: ?champions=Zed,Ahri[&format=mermaid].
+    The PNG is rendered once per cast and process (see graph_diagram); when it cannot be
+    rendered, the Mermaid source is returned instead. Only enabled with GRAPH_DIAGRAM_ENDPOINT.
+    """
+    from app.utils.core.graph_diagram import graph_png, mermaid_source
+
+    if not current_app.config["GRAPH_DIAGRAM_ENDPOINT"]:
+        return jsonify({"success": False, "message": "Not found."}), 404
+
+    names = [name.strip() for name in request.args.get("champions", "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in Role.__members__]
+    if not names or unknown:
+        return jsonify({
+            "success": False,
+            "message": f"'champions' must list known champions, unknown: {unknown}",
+        }), 400
+
+    png = graph_png(names) if request.args.get("format", "png") == "png" else None
+    if png is not None:
+        return Response(png, mimetype="image/png", headers={"Cache-Control": "public, max-age=3600"})
+    return Response(mermaid_source(names), mimetype="text/plain", headers={"Cache-Control": "public, max-age=3600"})
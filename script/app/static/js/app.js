@@ -454,15 +454,162 @@ function enableHorizontalWheelScroll(el) {
     }, { passive: false });
 }
 
+/**
+ * Parses one Server-Sent Events frame ("event: ...\ndata: ...") into { event, data }.
+ */
+function parseSseFrame(raw) {
+    let event = 'message';
+    const dataLines = [];
+    raw.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+    });
+    if (!dataLines.length) return null;
+    try {
+        return { event, data: JSON.parse(dataLines.join('\n')) };
+    } catch (e) {
+        console.warn('Malformed stream frame:', raw);
+        return null;
+    }
+}
+
+/**
+ * Reads a text/event-stream response body and calls onFrame for every complete frame.
+ */
+async function readStoryStream(response, onFrame) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+            const frame = parseSseFrame(buffer.slice(0, sep));
+            buffer = buffer.slice(sep + 2);
+            if (frame) onFrame(frame);
+        }
+    }
+}
+
+/**
+ * Appends a single streamed story frame to the story output panel.
+ */
+function renderStoryFrame({ event, data }) {
+    const panel = $('#storyOutput');
+    const log = $('#storyLog');
+    if (!panel || !log) return;
+    panel.hidden = false;
+
+    const append = (className, html) => {
+        const el = document.createElement('p');
+        el.className = className;
+        el.innerHTML = html;
+        log.appendChild(el);
+        el.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
+        return el;
+    };
+
+    switch (event) {
+        case 'start':
+            log.innerHTML = '';
+            break;
+        case 'event':
+            append('story-event', escapeHtml(data.text));
+            break;
+        case 'speaker':
+            append('story-speaker muted', data.name === 'Event' ? 'Next event…' : `${escapeHtml(data.name)} is speaking…`);
+            break;
+        case 'line':
+            append('story-line', escapeHtml(data.text));
+            break;
+        case 'chunk': {
+            // Token chunks of the chapter, rendered as plain text until the final frame arrives
+            let live = $('.story-novel.streaming', log);
+            if (!live) {
+                live = append('story-novel streaming', '');
+            }
+            live.textContent += data.text;
+            break;
+        }
+        case 'novel': {
+            const html = escapeHtml(data.text).replace(/\n+/g, '<br><br>');
+            const live = $('.story-novel.streaming', log);
+            if (live) {
+                live.classList.remove('streaming');
+                live.innerHTML = html;
+            } else {
+                append('story-novel', html);
+            }
+            break;
+        }
+        case 'done':
+            toast('✅ Story complete!');
+            break;
+        case 'error':
+            toast(`❌ ${data.message || 'Story generation failed.'}`);
+            break;
+        case 'cancelled':
+            toast('⏹️ Story cancelled.');
+            break;
+    }
+}
+
+/**
+ * Handles a plain JSON answer from the server (validation feedback, auto-generated story, errors).
+ */
+function handleSubmitResponse(data, feedbackDiv) {
+    console.log('Server response:', data);
+
+    if (data.needs_retry) {
+        // Story validation failed, show feedback
+        state.retryCount = data.retry_count;
+
+        feedbackDiv.textContent = `⚠️ ${data.feedback} (Attempt ${data.retry_count}/3)`;
+        feedbackDiv.style.display = 'block';
+        toast(`⚠️ ${data.feedback}`);
+
+    } else if (data.auto_generated) {
+        // Max retries reached, story was auto-generated
+        state.retryCount = 0;
+
+        const storyTextarea = $('#story');
+        storyTextarea.value = data.generated_story;
+
+        feedbackDiv.textContent = `ℹ️ ${data.message} Please review and submit again.`;
+        feedbackDiv.style.display = 'block';
+        feedbackDiv.style.background = '#d1ecf1';
+        feedbackDiv.style.borderColor = '#17a2b8';
+        feedbackDiv.style.color = '#0c5460';
+        toast('ℹ️ Story generated. Please review and submit.');
+
+    } else if (data.success) {
+        // Story generation started successfully
+        state.retryCount = 0;
+        toast('✅ Story generation started!');
+        feedbackDiv.style.display = 'none';
+
+    } else if (data.retry_after) {
+        // Server is busy, the story was not queued
+        toast(`⏳ Server is busy, please try again in ${data.retry_after}s.`);
+
+    } else {
+        // Other error
+        toast('❌ Server failed to process request.');
+    }
+}
+
 /**
  * Main initialization function.
  */
 (async function init() {
     document.body.classList.add('is-init');
 
+    // Versioned catalog URLs from the server, cached by the browser until the catalog changes
     [state.champions, state.models] = await Promise.all([
-        loadList('static/champions.txt'),
-        loadList('static/models.txt')
+        loadList(document.body.dataset.championsUrl || 'static/champions.txt'),
+        loadList(document.body.dataset.modelsUrl || 'static/models.txt')
     ]);
 
     addCharacter({}, { animate: false });
@@ -517,50 +664,25 @@ function enableHorizontalWheelScroll(el) {
         submitBtn.disabled = true;
         submitBtn.textContent = 'Processing...';
 
-        // Send the payload to the Flask backend
-        fetch('/submit-data', {
+        // Send the payload to the Flask backend; the story is streamed back frame by frame
+        fetch('/submit-data/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify(payload)
         })
-        .then(response => response.json())
-        .then(data => {
-            console.log('Server response:', data);
-            
-            if (data.needs_retry) {
-                // Story validation failed, show feedback
-                state.retryCount = data.retry_count;
-                
-                feedbackDiv.textContent = `⚠️ ${data.feedback} (Attempt ${data.retry_count}/3)`;
-                feedbackDiv.style.display = 'block';
-                toast(`⚠️ ${data.feedback}`);
-                
-            } else if (data.auto_generated) {
-                // Max retries reached, story was auto-generated
-                state.retryCount = 0;
-                
-                const storyTextarea = $('#story');
-                storyTextarea.value = data.generated_story;
-                
-                feedbackDiv.textContent = `ℹ️ ${data.message} Please review and submit again.`;
-                feedbackDiv.style.display = 'block';
-                feedbackDiv.style.background = '#d1ecf1';
-                feedbackDiv.style.borderColor = '#17a2b8';
-                feedbackDiv.style.color = '#0c5460';
-                toast('ℹ️ Story generated. Please review and submit.');
-                
-            } else if (data.success) {
-                // Story generation started successfully
-                state.retryCount = 0;
-                toast('✅ Story generation started!');
-                feedbackDiv.style.display = 'none';
-                
-            } else {
-                // Other error
-                toast('❌ Server failed to process request.');
+        .then(async response => {
+            const contentType = response.headers.get('Content-Type') || '';
+            if (!contentType.includes('text/event-stream')) {
+                handleSubmitResponse(await response.json(), feedbackDiv);
+                return;
             }
+
+            state.retryCount = 0;
+            feedbackDiv.style.display = 'none';
+            toast('✅ Story generation started!');
+            await readStoryStream(response, renderStoryFrame);
         })
         .catch(error => {
             console.error('Network error:', error);
@@ -6,8 +6,10 @@ from app.utils.data_models.agent_state import AgentState
 from app.utils.data_models.agent_logger_item import AgentLoggerItem
 
 
-from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
+from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage, AIMessage
+from langchain_core.messages.utils import message_chunk_to_message
 from langchain_core.tools import BaseTool
+from langgraph.config import get_stream_writer
 
 
 class Agent(ABC):
@@ -24,8 +26,16 @@ class Agent(ABC):
         Key of the currently active model.
     _tools : List[BaseTool]
         LangChain-compatible tools available to the agent.
+    stream_tokens : bool
+        If True, the reply is requested with `llm.stream` and every chunk is forwarded to the
+        graph's custom stream as it arrives (see StoryTeller.stream).
+
+    Every agent can be called synchronously (`__call__`) or awaited (`__acall__`); the story
+    graph's nodes use whichever matches the way the graph is run.
     """
 
+    stream_tokens: bool = False
+
     def __init__(self, role_name: Role):
         self.role_name = role_name  #
         self._models: Dict[str, ModelConfig] = {}
@@ -80,7 +90,24 @@ class Agent(ABC):
         Execute an LLM call for the given state and return the updated state.
         - If `state.model` is provided, switch to that registered model.
         - Prepend this agent's role-specific system preset to the message history.
-        - Append the AI response to `messages`.
+        - Return the AI response as the only new message of `messages` (the state's reducer appends it).
+        """
+        llm, messages_for_ai = self._prepare_call(state)
+        ai = self._invoke_llm(llm, messages_for_ai)
+        return self._finish_call(state, messages_for_ai, ai, add_to_state)
+
+    async def __acall__(self, state: AgentState, add_to_state: bool = True) -> AgentState:
+        """
+        Same as `__call__`, but awaits the LLM instead of blocking the thread.
+        """
+        llm, messages_for_ai = self._prepare_call(state)
+        ai = await self._ainvoke_llm(llm, messages_for_ai)
+        return self._finish_call(state, messages_for_ai, ai, add_to_state)
+
+    def _prepare_call(self, state: AgentState):
+        """
+        Selects the model and builds the messages for this agent's LLM call.
+        Returns (llm, messages_for_ai).
         """
         if "model" in state and state["model"] is not None:
             self.set_active_model(state["model"])
@@ -98,17 +125,55 @@ class Agent(ABC):
 
         messages_for_ai = [self._system_message] + state["messages"] + [self._human_message]
         # self._log_llm_input(self._active_model_key, messages_for_ai)    
+        return llm, messages_for_ai
 
-        ai = llm.invoke(messages_for_ai)
-
+    def _finish_call(
+        self, state: AgentState, messages_for_ai: List[BaseMessage], ai: BaseMessage, add_to_state: bool
+    ) -> AgentState:
         self._log_llm_invocation(messages_for_ai, ai)
 
         # self._log_llm_output(ai)
 
-        updated_message = state["messages"] + [ai] if add_to_state else state["messages"]
+        new_messages = [ai] if add_to_state else []
 
-        return {"messages": updated_message, "ai_response": ai}
-        # return {"messages": state["messages"] + [ai]} if add_to_state else {"messages": state["messages"]}
+        return {"messages": new_messages, "ai_response": ai}
+
+    def _invoke_llm(self, llm, messages_for_ai: List[BaseMessage]) -> BaseMessage:
+        """
+        Calls the LLM. When `stream_tokens` is set, chunks are forwarded to the custom
+        stream writer as {"agent", "text"} and the full message is assembled at the end.
+        """
+        if not self.stream_tokens:
+            return llm.invoke(messages_for_ai)
+
+        writer = _get_token_writer()
+        full = None
+        for chunk in llm.stream(messages_for_ai):
+            full = chunk if full is None else full + chunk
+            if isinstance(chunk.content, str) and chunk.content:
+                writer({"agent": self.role_name.value, "text": chunk.content})
+
+        if full is None:
+            return AIMessage(content="")
+        return message_chunk_to_message(full)
+
+    async def _ainvoke_llm(self, llm, messages_for_ai: List[BaseMessage]) -> BaseMessage:
+        """
+        Async counterpart of `_invoke_llm`, using `ainvoke` / `astream`.
+        """
+        if not self.stream_tokens:
+            return await llm.ainvoke(messages_for_ai)
+
+        writer = _get_token_writer()
+        full = None
+        async for chunk in llm.astream(messages_for_ai):
+            full = chunk if full is None else full + chunk
+            if isinstance(chunk.content, str) and chunk.content:
+                writer({"agent": self.role_name.value, "text": chunk.content})
+
+        if full is None:
+            return AIMessage(content="")
+        return message_chunk_to_message(full)
 
     def _log_llm_invocation(self, messages_for_ai: List[BaseMessage], ai: BaseMessage):
         """Logs the LLM invocation details using the Logger instance."""
@@ -140,3 +205,13 @@ class Agent(ABC):
             print(f"Tool Calls Detected: {len(output_message.tool_calls)}")
         # Log other metadata as needed, e.g., token usage from response_metadata
         print(f"----------------------\n")
+
+
+def _get_token_writer():
+    """
+    Returns the graph's stream writer, or a no-op when called outside a graph run.
+    """
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return lambda _: None
@@ -8,9 +8,17 @@ from app.utils.constants.champion_lore import (
 )
 
 class ChampionAgent(Agent):
-    def __init__(self, role_name: Role, traits: Optional[Set[str]] = None, story_context: str = None):
+    def __init__(
+        self,
+        role_name: Role,
+        traits: Optional[Set[str]] = None,
+        story_context: str = None,
+        lore: Optional[str] = None,
+    ):
         self.traits = traits if traits is not None else set()
         self.story_context = story_context
+        # Already fetched (and summarized) lore; fetched here if not given
+        self.lore = lore
         super().__init__(role_name)
 
     def _init_system_message(self) -> SystemMessage:
@@ -32,7 +40,8 @@ class ChampionAgent(Agent):
         1. Check the past conversations.
         2. Roleplay as {champion}, draft what you will say to continue the story. Make sure it fits the {champion} with personality and lore provided, and it is certain to progress the story.
         """
-        lore = get_lore(self.role_name.value, story_context=self.story_context)
+        # Kept, so that a resumed story does not summarize it again (see StoryTeller.lore)
+        self.lore = lore = self.lore or get_lore(self.role_name.value, story_context=self.story_context)
         # Debug print - show full summarized lore for testing
         print(f"\n{'='*80}")
         print(f"Champion: {self.role_name.value}")
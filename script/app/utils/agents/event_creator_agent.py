@@ -89,11 +89,19 @@ class EventCreatorAgent(Agent):
         # print(state)
         # Reuse the base Agent call, to be deleted if no additional change is required.
         output = super().__call__(state, add_to_state=False)
+        return self._with_events(output)
 
+    async def __acall__(self, state: AgentState) -> AgentState:
+        output = await super().__acall__(state, add_to_state=False)
+        return self._with_events(output)
 
-
+    @staticmethod
+    def _with_events(output: AgentState) -> AgentState:
+        """
+        Splits the event list out of the reply and puts the first event into the script.
+        """
         event_list = deque(output["ai_response"].content.split("\n"))
         next_event = event_list.popleft()
         output["event_list"] = event_list
-        output["messages"].append(AIMessage(content=f"Event: {next_event}"))
+        output["messages"] = [AIMessage(content=f"Event: {next_event}")]
         return output
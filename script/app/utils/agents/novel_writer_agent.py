@@ -6,6 +6,9 @@ from app.utils.data_models.agent_state import AgentState
 
 
 class NovelWriterAgent(Agent):
+    # The chapter is the longest single call in the pipeline, stream it to the client
+    stream_tokens = True
+
     def __init__(self, role_name: Role, min_words: int, max_words: int):
         self.min_words = min_words
         self.max_words = max_words
@@ -54,3 +57,7 @@ class NovelWriterAgent(Agent):
         # Reuse the base Agent call, to be deleted if no additional change is required.
         print("\n Novel Writer called \n")
         return super().__call__(state, add_to_state=False)
+
+    async def __acall__(self, state: AgentState) -> AgentState:
+        print("\n Novel Writer called \n")
+        return await super().__acall__(state, add_to_state=False)
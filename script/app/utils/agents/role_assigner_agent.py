@@ -1,8 +1,9 @@
+from collections import deque
 from typing import List, Tuple, Optional
 from app.utils.constants.roles import Role
 from app.utils.agents.agent import Agent
-from langchain_core.messages import SystemMessage, HumanMessage
-from app.utils.data_models.agent_state import AgentState
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from app.utils.data_models.agent_state import AgentState, past_deadline
 
 # ---------- Strict, simple parsers (single-token names only) ----------
 
@@ -111,9 +112,52 @@ class RoleAssignerAgent(Agent):
           - No consecutive Events.
         Stores ONLY exact champion tokens from champions_list OR 'Event'.
         Deviation is coerced to 'Event'.
+        Once the run's deadline has passed, 'Event' is picked without asking the LLM.
+        Returns only the update: the pick, and the event played before it if any.
         """
+        state, update = self._play_pending_event(state)
+        if past_deadline():
+            return self._wrap_up(state, update)
         full_response = super().__call__(state, add_to_state=False)["ai_response"].content.strip()
+        return self._apply_pick(state, full_response, update)
 
+    async def __acall__(self, state: AgentState) -> AgentState:
+        state, update = self._play_pending_event(state)
+        if past_deadline():
+            return self._wrap_up(state, update)
+        full_response = (await super().__acall__(state, add_to_state=False))["ai_response"].content.strip()
+        return self._apply_pick(state, full_response, update)
+
+    @staticmethod
+    def _play_pending_event(state: AgentState) -> Tuple[AgentState, AgentState]:
+        """
+        After an 'Event' pick with events left, the graph comes back here (see role_assigner_node):
+        the next event goes into the script before picking who reacts to it.
+        Returns (state seen by this call, update adding the event).
+        """
+        history: List[str] = state.get("next_bot", [])
+        events = state.get("event_list")
+        if not history or history[-1] != "Event" or not events:
+            return state, {}
+
+        remaining = deque(events)
+        event = AIMessage(content=remaining.popleft())
+        update = {"messages": [event], "event_list": remaining}
+        return {**state, "messages": state["messages"] + [event], "event_list": remaining}, update
+
+    def _wrap_up(self, state: AgentState, update: AgentState) -> AgentState:
+        """
+        Picks 'Event' so that the graph skips the remaining events and moves on to the NovelWriterBot.
+        """
+        update["next_bot"] = state.get("next_bot", []) + ["Event"]
+        update["reason_log"] = state.get("reason_log", []) + ["Deadline reached"]
+        print("[RoleAssigner] Next: Event | Reason: Deadline reached")
+        return update
+
+    def _apply_pick(self, state: AgentState, full_response: str, update: AgentState) -> AgentState:
+        """
+        Applies the pacing rules to the raw '<Name or Event> || <reason>' answer and adds the pick to `update`.
+        """
         # Parse
         parsed = _parse_with_delimiter(full_response)
         if parsed is not None:
@@ -121,8 +165,9 @@ class RoleAssignerAgent(Agent):
             pick = pick.strip()
             pick = pick.replace(" ", "")
         else:
-            print("delimiter not applied correctly")
-            exit(-1)
+            # Fall back to an Event rather than failing the story; the pacing rules below still apply
+            print(f"[RoleAssigner] Delimiter not applied correctly, falling back to Event: {full_response!r}")
+            pick, reason = "Event", "Unparseable pick"
 
 
         history: List[str] = state.get("next_bot", [])
@@ -148,8 +193,8 @@ class RoleAssignerAgent(Agent):
 
 
         # Store
-        state.setdefault("next_bot", []).append(pick)
-        state.setdefault("reason_log", []).append(reason)
+        update["next_bot"] = history + [pick]
+        update["reason_log"] = state.get("reason_log", []) + [reason]
         print(f"[RoleAssigner] Next: {pick} | Reason: {reason}")
 
-        return state
+        return update
@@ -1,14 +1,15 @@
 from typing import List
 from app.utils.constants.roles import Role
 from app.utils.agents.agent import Agent
-from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
+from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage, RemoveMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from app.utils.data_models.agent_state import AgentState
 
 
 class SummarizerAgent(Agent):
     """
-    Summarizes earlier conversation and rewrites state['messages'] as:
-      [System(running memory)] + last_k_messages
+    Summarizes earlier conversation and replaces state['messages'] with:
+      [running memory] + last_k_messages
 
     Notes:
     - Uses the currently active model registered on this Agent (via register_model / set_active_model).
@@ -46,12 +47,34 @@ class SummarizerAgent(Agent):
     def __call__(self, state: AgentState) -> AgentState:
         """
         Compress older history into a single SystemMessage + keep last k messages.
-        Rewrites state['messages'] and returns updated state.
+        Returns the update replacing state['messages'].
+        """
+        compression = self._prepare_compression(state)
+        if compression is None:
+            # Nothing to compress; no update
+            return {}
+
+        llm, messages_for_ai, tail = compression
+        summary = llm.invoke(messages_for_ai)
+        return self._replace_history(state, messages_for_ai, summary, tail)
+
+    async def __acall__(self, state: AgentState) -> AgentState:
+        compression = self._prepare_compression(state)
+        if compression is None:
+            return {}
+
+        llm, messages_for_ai, tail = compression
+        summary = await llm.ainvoke(messages_for_ai)
+        return self._replace_history(state, messages_for_ai, summary, tail)
+
+    def _prepare_compression(self, state: AgentState):
+        """
+        Returns (llm, messages_for_ai, tail) for the summary call, or None if the history
+        is still short enough to keep as is.
         """
         messages: List[BaseMessage] = state.get("messages", [])
         if not messages or len(messages) <= self.k_keep:
-            # Nothing to compress; pass through unchanged
-            return state
+            return None
 
         print("\n Summarization Happened\n")
 
@@ -66,10 +89,12 @@ class SummarizerAgent(Agent):
         llm = self._models[self._active_model_key].get_llm()
 
         messages_for_ai = [self._system_message] + head + [self._human_message] #!
+        return llm, messages_for_ai, tail
 
-        summary = llm.invoke(messages_for_ai)
-
+    def _replace_history(
+        self, state: AgentState, messages_for_ai: List[BaseMessage], summary: BaseMessage, tail: List[BaseMessage]
+    ) -> AgentState:
         self._log_llm_invocation(messages_for_ai, summary) # !
 
-        state["messages"] = [summary] + tail
-        return state
+        # The messages reducer only appends; removing everything first makes this a replacement
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), summary] + tail}
@@ -1,5 +1,39 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
 from app.data_extraction.fetch_from_s3 import fetch_data_from_s3
-from app.utils.lore_summarizer import summarize_lore
+from app.utils.lore_summarizer import asummarize_lore, summarize_lore
+
+# Raw lore per champion as stored in S3. It only changes when the lore is re-scraped, so it is
+# kept for the lifetime of the process; preloaded before forking it is shared by all workers.
+_lore_cache: Dict[str, str] = {}
+_lore_cache_lock = threading.Lock()
+
+
+def fetch_lore(name) -> Optional[str]:
+    """
+    Returns the raw lore of a champion, fetching it from S3 on first use.
+    """
+    name = name.replace(" ", "_")
+    with _lore_cache_lock:
+        if name in _lore_cache:
+            return _lore_cache[name]
+    lore = fetch_data_from_s3(name, "background")
+    # A failed fetch is retried next time
+    if lore:
+        with _lore_cache_lock:
+            _lore_cache[name] = lore
+    return lore
+
+
+def preload_lore(names: Iterable[str], max_workers: int = 8):
+    """
+    Fetches the raw lore of the given champions into the cache.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lore-preload") as executor:
+        list(executor.map(fetch_lore, names))
+
 
 def get_lore(name, story_context=None):
     """
@@ -13,7 +47,7 @@ def get_lore(name, story_context=None):
         Full lore if no story_context provided, otherwise summarized lore
     """
     name = name.replace(" ", "_")
-    lore = fetch_data_from_s3(name, "background")
+    lore = fetch_lore(name)
     
     if not lore:
         return f"{name} is a champion from League of Legends."
@@ -22,4 +56,21 @@ def get_lore(name, story_context=None):
     if story_context:
         return summarize_lore(name, lore, story_context)
     
-    return lore
\ No newline at end of file
+    return lore
+
+
+async def aget_lore(name, story_context=None):
+    """
+    Async version of get_lore. The S3 client is blocking, so the fetch runs in a thread;
+    the summary is awaited.
+    """
+    name = name.replace(" ", "_")
+    lore = await asyncio.to_thread(fetch_lore, name)
+
+    if not lore:
+        return f"{name} is a champion from League of Legends."
+
+    if story_context:
+        return await asummarize_lore(name, lore, story_context)
+
+    return lore
@@ -3,7 +3,7 @@ from enum import Enum
 from typing import Dict, Optional, Any
 from dotenv import load_dotenv
 from pathlib import Path
-from langchain.chat_models import init_chat_model
+import threading
 
 load_dotenv()
 
@@ -58,6 +58,9 @@ class ModelConfig:
         Lazily initializes and returns the chat model instance.
         """
         if self._llm is None:
+            # Imported on first use, it pulls in langchain and the provider package
+            from langchain.chat_models import init_chat_model
+
             self._llm = init_chat_model(
                 model=self.model_name,
                 model_provider=self.provider,
@@ -67,6 +70,12 @@ class ModelConfig:
             )
         return self._llm
 
+    def reset_llm(self):
+        """
+        Drops the cached chat model, e.g. in a forked worker whose inherited gRPC channel is unusable.
+        """
+        self._llm = None
+
 
 class ModelChoices(Enum):
     gemini_2_0_flash_lite = ModelConfig("gemini-2.0-flash-lite", "gemini")
@@ -76,3 +85,25 @@ class ModelChoices(Enum):
     Event = ModelConfig("gemini-2.5-flash-lite", "gemini")
     Novel = ModelConfig("gemini-2.5-flash-lite", "gemini")
     RoleAssigner = ModelConfig("gemini-2.5-flash-lite", "gemini")
+
+
+_gemini_models: Dict[str, Any] = {}
+_gemini_lock = threading.Lock()
+
+
+def get_gemini_model(model_name: str):
+    """
+    Returns a google.generativeai GenerativeModel for the direct (non-LangChain) Gemini calls,
+    importing and configuring the SDK on first use rather than at import time.
+    """
+    with _gemini_lock:
+        if model_name not in _gemini_models:
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                raise RuntimeError("GOOGLE_API_KEY missing in environment")
+
+            import google.generativeai as genai
+
+            genai.configure(api_key=api_key)
+            _gemini_models[model_name] = genai.GenerativeModel(model_name)
+        return _gemini_models[model_name]
@@ -38,7 +38,8 @@ class AgentFactory:
         agent = ChampionAgent(
             role_name=config.role,
             traits=config.traits,
-            story_context=story_context
+            story_context=story_context,
+            lore=getattr(config, 'lore', None)
         )
 
         return self._configure_agent(agent, config)
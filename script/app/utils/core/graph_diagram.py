@@ -0,0 +1,70 @@
+"""
+Diagrams of the story graph, kept off the request path.
+
+Rendering a PNG goes through the remote Mermaid.INK service, so it is done at most once per cast
+and per process, and only on demand: from the command line or from the /debug/graph endpoint.
+Without network access the Mermaid source is returned instead, which renders anywhere Mermaid does.
+
+    python -m app.utils.core.graph_diagram Zed Ahri --out graph.png
+"""
+import argparse
+import functools
+from typing import Iterable, Optional, Tuple
+from app.utils.core.story_teller import compiled_graph
+
+
+def mermaid_source(champion_names: Iterable[str]) -> str:
+    """
+    Mermaid source of the story graph for a cast; needs no network.
+    """
+    return _mermaid_source(_cast(champion_names))
+
+
+def graph_png(champion_names: Iterable[str]) -> Optional[bytes]:
+    """
+    PNG of the story graph for a cast, or None if it could not be rendered (e.g. no network).
+    """
+    return _graph_png(_cast(champion_names))
+
+
+def _cast(champion_names: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sorted(champion_names))
+
+
+@functools.lru_cache(maxsize=32)
+def _mermaid_source(cast: Tuple[str, ...]) -> str:
+    return compiled_graph(cast).get_graph().draw_mermaid()
+
+
+# A failed rendering is cached as well, so an offline server does not retry it on every call
+@functools.lru_cache(maxsize=32)
+def _graph_png(cast: Tuple[str, ...]) -> Optional[bytes]:
+    try:
+        return compiled_graph(cast).get_graph().draw_mermaid_png(max_retries=1)
+    except Exception as e:
+        print(f"Could not render the story graph as PNG, use the Mermaid source instead: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("champions", nargs="+", help="champion node names of the cast, e.g. Zed Ahri")
+    parser.add_argument("--out", default="graph.png", help="PNG file to write")
+    parser.add_argument("--mermaid", action="store_true", help="only write the Mermaid source")
+    args = parser.parse_args()
+
+    png = None if args.mermaid else graph_png(args.champions)
+    if png is not None:
+        with open(args.out, "wb") as f:
+            f.write(png)
+        print(f"Wrote {args.out}")
+        return
+
+    out = args.out.rsplit(".", 1)[0] + ".mmd"
+    with open(out, "w") as f:
+        f.write(mermaid_source(args.champions))
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import gzip
+import hashlib
+import os
+import threading
+from typing import Dict, Tuple
+import zstandard
+from flask import Response, current_app, request
+
+# (path) -> ((mtime, size), content hash); the catalogs are rewritten on startup, not per request
+_versions: Dict[str, Tuple[Tuple[float, int], str]] = {}
+_versions_lock = threading.Lock()
+
+
+def file_version(path: str) -> str:
+    """
+    Short content hash of a static file, used as its ETag and as the `v` query parameter of
+    versioned URLs. Recomputed only when the file's mtime or size changes.
+    """
+    stat = os.stat(path)
+    key = (stat.st_mtime, stat.st_size)
+    with _versions_lock:
+        cached = _versions.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    with open(path, "rb") as f:
+        version = hashlib.sha256(f.read()).hexdigest()[:16]
+    with _versions_lock:
+        _versions[path] = (key, version)
+    return version
+
+
+def compress_response(response: Response) -> Response:
+    """
+    after_request hook: compresses JSON responses of at least COMPRESS_MIN_BYTES with zstd or
+    gzip, whichever the client accepts (zstd preferred on a tie). Streamed responses such as the
+    Server-Sent Events of /submit-data/stream are left alone, so frames are not held back.
+    """
+    if (
+        response.mimetype != "application/json"
+        or response.is_streamed
+        or response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    body = response.get_data()
+    if len(body) < current_app.config["COMPRESS_MIN_BYTES"]:
+        return response
+
+    zstd_quality = request.accept_encodings.quality("zstd")
+    gzip_quality = request.accept_encodings.quality("gzip")
+    if zstd_quality > 0 and zstd_quality >= gzip_quality:
+        encoding = "zstd"
+        compressed = zstandard.ZstdCompressor(level=current_app.config["COMPRESS_ZSTD_LEVEL"]).compress(body)
+    elif gzip_quality > 0:
+        encoding = "gzip"
+        compressed = gzip.compress(body, compresslevel=current_app.config["COMPRESS_GZIP_LEVEL"])
+    else:
+        response.vary.add("Accept-Encoding")
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
@@ -1,13 +1,14 @@
 from langchain_core.messages import BaseMessage
-from typing import List
-import pandas as pd
+from typing import List, TYPE_CHECKING
 import json
 import io
 import os
-import boto3
 from dotenv import load_dotenv
 from app.utils.data_models.agent_logger_item import AgentLoggerItem
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class Logger:
     def __init__(self):
@@ -37,7 +38,10 @@ class Logger:
     def clear_logs(self):
         self.logs = []
 
-    def format_logs_to_dataframe(self) -> pd.DataFrame:
+    def format_logs_to_dataframe(self) -> "pd.DataFrame":
+        # pandas is only needed for the S3 export, not on every story
+        import pandas as pd
+
         # Use json_normalize to flatten the data
         df = pd.json_normalize(
             data=self.logs,
@@ -80,6 +84,8 @@ class Logger:
         # parquet_buffer.seek(0)
 
     def save_logs_to_S3(self):
+        import boto3
+        import pandas as pd
 
         log_df = self.format_logs_to_dataframe()
 
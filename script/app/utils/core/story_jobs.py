@@ -0,0 +1,445 @@
+from app.utils.data_models.story_job_item import JobStatus, StoryJobItem
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import concurrent.futures
+import hashlib
+import inspect
+import json
+import math
+import threading
+import time
+import uuid
+
+
+class StoryQueueFullError(Exception):
+    """
+    Raised when a story job is submitted while the wait queue (or the client's share of it) is full.
+    `retry_after` is the estimated number of seconds until a slot frees up.
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class StoryCancelledError(Exception):
+    """
+    Raised by a job function that stops early because its job was cancelled (see StoryJobManager.cancel).
+    """
+
+
+def story_fingerprint(scenario: str, champions: List[Dict[str, str]]) -> str:
+    """
+    Content fingerprint of a preflighted story request: the normalized scenario and,
+    in cast order, every champion's name, personality and model.
+    """
+    def normalize(text) -> str:
+        return " ".join(str(text or "").split()).lower()
+
+    payload = {
+        "scenario": normalize(scenario),
+        "champions": [
+            [normalize(c["name"]), normalize(c["personality"]), normalize(c["models"])]
+            for c in champions
+        ],
+    }
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _is_reusable(job: Optional[StoryJobItem]) -> bool:
+    # A failed or cancelled job is not reused, the submission runs again
+    return job is not None and job.status not in (JobStatus.failed, JobStatus.cancelled)
+
+
+class StoryJobManager:
+    """
+    Runs story generation jobs on a fixed-size pool of worker threads fed by a bounded queue.
+
+    Admission control: at most `max_workers` stories run at once and at most `max_queue` wait;
+    beyond that submissions are rejected with a retry estimate. Waiting jobs are kept in one
+    queue per client and workers take them round-robin across clients, so a client that submits
+    a batch cannot starve the others; a single client may hold at most `max_queued_per_client`
+    waiting jobs.
+
+    With `run_async`, jobs do not get a thread each: they all run as tasks on one event loop
+    thread, at most `max_workers` at a time, so one process can multiplex many stories that
+    mostly wait on the network. Job functions may be sync or `async def` in either mode;
+    a sync function in async mode runs in a thread, an async one in thread mode gets its own
+    event loop.
+
+    Submissions are deduplicated: a job submitted with the same idempotency key or the same
+    content fingerprint as a queued, running or recently succeeded job is not run again,
+    the existing job is returned instead.
+
+    Jobs can be cancelled: a waiting job is dropped from the queue, a running one is asked to
+    stop (job functions check `job.cancel_requested` between graph nodes and raise
+    StoryCancelledError) and, in async mode, its task is cancelled right away, which also aborts
+    the LLM request it is waiting on.
+
+    Parameters
+    ----------
+    max_workers : int
+        Number of stories that may run concurrently.
+    max_queue : int
+        Number of stories that may wait for a free worker before submissions are rejected.
+    max_queued_per_client : Optional[int]
+        Number of stories a single client may have waiting; defaults to a quarter of `max_queue`.
+    max_finished : int
+        Number of finished jobs kept in memory for status lookups and deduplication.
+    dedupe_window : float
+        Seconds during which a succeeded job is reused for a submission with the same fingerprint.
+        Reuse by idempotency key is not limited by the window.
+    run_async : bool
+        Run jobs on a shared event loop instead of on worker threads.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 16,
+        max_queued_per_client: Optional[int] = None,
+        max_finished: int = 256,
+        dedupe_window: float = 600,
+        run_async: bool = False,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(1, int(max_queue))
+        self.max_queued_per_client = max(1, int(max_queued_per_client or self.max_queue // 4))
+        self.max_finished = max(1, int(max_finished))
+        self.dedupe_window = dedupe_window
+        self.run_async = run_async
+        # Waiting jobs per client; the first client in the dict is served next
+        self._waiting: "OrderedDict[str, Deque[tuple]]" = OrderedDict()
+        self._waiting_count = 0
+        self._work_available = threading.Condition()
+        # Running average of story durations, used for Retry-After estimates
+        self._avg_duration = 60.0
+        self._jobs: "OrderedDict[str, StoryJobItem]" = OrderedDict()
+        self._by_fingerprint: Dict[str, str] = {}
+        self._by_idempotency_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._workers = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Async mode: futures of the running jobs, used to cancel them
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+        # Number of clients following each job's frames (see follow)
+        self._followers: Dict[str, int] = {}
+
+    def _ensure_started(self):
+        """
+        Starts the worker threads on first use, so that no thread exists before the server forks.
+        """
+        with self._lock:
+            if self._workers:
+                return
+            if self.run_async:
+                self._start_event_loop()
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(
+                    target=self._worker_loop, name=f"story-worker-{i}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        fingerprint: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        client_id: str = "anonymous",
+        job_id: Optional[str] = None,
+        dedupe: bool = True,
+        **kwargs,
+    ) -> StoryJobItem:
+        """
+        Enqueues `fn(job, *args, **kwargs)` for `client_id` and returns the job item immediately.
+        If a reusable job with the same idempotency key or fingerprint exists, it is returned instead,
+        unless `dedupe` is False; the new job then does not take over the keys of such a job either.
+        Raises StoryQueueFullError if the wait queue or the client's share of it is full.
+        `job_id` is generated if None; a resumed story passes its own id and replaces its finished job.
+        """
+        self._ensure_started()
+        with self._lock:
+            existing = self._find_locked(fingerprint, idempotency_key)
+            if existing is not None and dedupe:
+                if idempotency_key:
+                    self._by_idempotency_key[idempotency_key] = existing.job_id
+                return existing
+
+            job = StoryJobItem(
+                job_id=job_id or uuid.uuid4().hex, fingerprint=fingerprint, idempotency_key=idempotency_key
+            )
+            with self._work_available:
+                self._check_admission_locked(client_id)
+                self._waiting.setdefault(client_id, deque()).append((job, fn, args, kwargs))
+                self._waiting_count += 1
+                self._work_available.notify()
+            self._jobs[job.job_id] = job
+            if existing is None:
+                if fingerprint:
+                    self._by_fingerprint[fingerprint] = job.job_id
+                if idempotency_key:
+                    self._by_idempotency_key[idempotency_key] = job.job_id
+        return job
+
+    def add_finished(
+        self,
+        job_id: str,
+        result: Dict,
+        frames: List[Tuple[str, Any]],
+        fingerprint: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> StoryJobItem:
+        """
+        Registers a story that already finished elsewhere (e.g. loaded from the story store)
+        as a succeeded job, so that submissions attach to it like to any other job.
+        `idempotency_key` is registered for the job even if it is known already.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if idempotency_key:
+                self._by_idempotency_key[idempotency_key] = job_id
+            if job is not None:
+                return job
+            job = StoryJobItem(
+                job_id=job_id, fingerprint=fingerprint, idempotency_key=idempotency_key, result=result
+            )
+            for frame_type, payload in frames:
+                job.publish(frame_type, payload)
+            job.set_status(JobStatus.succeeded)
+            self._jobs[job_id] = job
+            if fingerprint:
+                self._by_fingerprint[fingerprint] = job_id
+        self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[StoryJobItem]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(
+        self, fingerprint: Optional[str] = None, idempotency_key: Optional[str] = None
+    ) -> Optional[StoryJobItem]:
+        """
+        Returns the job a submission with this idempotency key or fingerprint would attach to.
+        """
+        with self._lock:
+            return self._find_locked(fingerprint, idempotency_key)
+
+    def cancel(self, job_id: str) -> Optional[StoryJobItem]:
+        """
+        Cancels a job: a waiting job is cancelled at once, a running one stops before its next
+        graph node (see StoryCancelledError). Finished jobs are left as they are.
+        Returns the job, or None if it is unknown.
+        """
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return job
+
+        job.request_cancel()
+        with self._work_available:
+            was_waiting = self._remove_waiting_locked(job)
+        if was_waiting:
+            self._cancel_job(job)
+            return job
+
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+        return job
+
+    def follow(self, job: StoryJobItem) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields the frames of `job` like job.iter_frames(). If the generator is closed before the
+        job finished (the client went away) and no other client follows the job, it is cancelled.
+        """
+        with self._lock:
+            self._followers[job.job_id] = self._followers.get(job.job_id, 0) + 1
+        try:
+            yield from job.iter_frames()
+        finally:
+            with self._lock:
+                self._followers[job.job_id] -= 1
+                last = self._followers[job.job_id] == 0
+                if last:
+                    del self._followers[job.job_id]
+            if last and not job.is_finished:
+                print(f"Last client of story job {job.job_id} went away, cancelling it")
+                self.cancel(job.job_id)
+
+    def check_admission(self, client_id: str = "anonymous"):
+        """
+        Raises StoryQueueFullError if a submission from `client_id` would be rejected right now.
+        Lets callers refuse a request before paying for its preflight.
+        """
+        with self._work_available:
+            self._check_admission_locked(client_id)
+
+    def queue_depth(self) -> int:
+        with self._work_available:
+            return self._waiting_count
+
+    def _check_admission_locked(self, client_id: str):
+        if self._waiting_count >= self.max_queue:
+            raise StoryQueueFullError(
+                f"Story queue is full ({self.max_queue} waiting).", self._retry_after_locked()
+            )
+        if len(self._waiting.get(client_id, ())) >= self.max_queued_per_client:
+            raise StoryQueueFullError(
+                f"Too many stories waiting for this client ({self.max_queued_per_client}).",
+                self._retry_after_locked(),
+            )
+
+    def _retry_after_locked(self) -> int:
+        """
+        Estimated seconds until a queue slot frees up: every waiting story still needs a worker.
+        """
+        rounds = self._waiting_count / self.max_workers
+        return max(1, math.ceil(self._avg_duration * max(rounds, 1)))
+
+    def _next_job(self) -> tuple:
+        """
+        Blocks until a job is waiting, then takes the oldest job of the next client in
+        round-robin order.
+        """
+        with self._work_available:
+            self._work_available.wait_for(lambda: self._waiting_count > 0)
+            client_id, jobs = next(iter(self._waiting.items()))
+            item = jobs.popleft()
+            self._waiting_count -= 1
+            del self._waiting[client_id]
+            if jobs:
+                # Back of the line for this client's next job
+                self._waiting[client_id] = jobs
+            return item
+
+    def _remove_waiting_locked(self, job: StoryJobItem) -> bool:
+        for client_id, jobs in self._waiting.items():
+            for item in jobs:
+                if item[0] is job:
+                    jobs.remove(item)
+                    self._waiting_count -= 1
+                    if not jobs:
+                        del self._waiting[client_id]
+                    return True
+        return False
+
+    def _find_locked(self, fingerprint: Optional[str], idempotency_key: Optional[str]):
+        if idempotency_key:
+            job = self._jobs.get(self._by_idempotency_key.get(idempotency_key))
+            if _is_reusable(job):
+                return job
+        if fingerprint:
+            job = self._jobs.get(self._by_fingerprint.get(fingerprint))
+            if _is_reusable(job) and (
+                not job.is_finished or time.time() - job.finished_at <= self.dedupe_window
+            ):
+                return job
+        return None
+
+    def _worker_loop(self):
+        while True:
+            job, fn, args, kwargs = self._next_job()
+            job.set_status(JobStatus.running)
+            try:
+                if job.cancel_requested:
+                    raise StoryCancelledError()
+                if inspect.iscoroutinefunction(fn):
+                    job.result = asyncio.run(fn(job, *args, **kwargs))
+                else:
+                    job.result = fn(job, *args, **kwargs)
+                job.set_status(JobStatus.succeeded)
+            except StoryCancelledError:
+                self._cancel_job(job)
+            except BaseException as e:
+                # Also SystemExit and the like: the job fails, the worker thread keeps serving
+                self._fail_job(job, e)
+            finally:
+                self._job_done(job)
+
+    def _start_event_loop(self):
+        """
+        Async mode: one thread runs the event loop, one dispatcher thread hands it a job
+        whenever one of the `max_workers` slots is free.
+        """
+        self._loop = asyncio.new_event_loop()
+        slots = threading.Semaphore(self.max_workers)
+
+        def dispatch():
+            while True:
+                slots.acquire()
+                job, fn, args, kwargs = self._next_job()
+                future = asyncio.run_coroutine_threadsafe(
+                    self._run_async_job(job, fn, args, kwargs), self._loop
+                )
+                with self._lock:
+                    self._futures[job.job_id] = future
+                future.add_done_callback(lambda _, job_id=job.job_id: self._async_job_done(job_id, slots))
+
+        for name, target in (("story-loop", self._loop.run_forever), ("story-dispatcher", dispatch)):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    async def _run_async_job(self, job: StoryJobItem, fn: Callable, args: tuple, kwargs: dict):
+        job.set_status(JobStatus.running)
+        try:
+            if job.cancel_requested:
+                raise StoryCancelledError()
+            if inspect.iscoroutinefunction(fn):
+                job.result = await fn(job, *args, **kwargs)
+            else:
+                job.result = await asyncio.to_thread(fn, job, *args, **kwargs)
+            job.set_status(JobStatus.succeeded)
+        except (StoryCancelledError, asyncio.CancelledError):
+            self._cancel_job(job)
+        except BaseException as e:
+            self._fail_job(job, e)
+        finally:
+            self._job_done(job)
+
+    def _async_job_done(self, job_id: str, slots: threading.Semaphore):
+        with self._lock:
+            self._futures.pop(job_id, None)
+        slots.release()
+
+    @staticmethod
+    def _fail_job(job: StoryJobItem, error: BaseException):
+        print(f"Story job {job.job_id} failed: {error!r}")
+        job.error = str(error) or type(error).__name__
+        job.publish("error", {"message": job.error})
+        job.set_status(JobStatus.failed)
+
+    @staticmethod
+    def _cancel_job(job: StoryJobItem):
+        print(f"Story job {job.job_id} cancelled")
+        job.publish("cancelled", {"job_id": job.job_id})
+        job.set_status(JobStatus.cancelled)
+
+    def _job_done(self, job: StoryJobItem):
+        # A cancelled story says nothing about how long stories take; a job that never got its
+        # timestamps (it did not reach a final status) is not timed either
+        if job.status != JobStatus.cancelled and job.started_at and job.finished_at:
+            self._record_duration(job.finished_at - job.started_at)
+        self._evict_finished()
+
+    def _record_duration(self, seconds: float):
+        with self._work_available:
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * seconds
+
+    def _evict_finished(self):
+        """
+        Drops the oldest finished jobs once more than `max_finished` are retained.
+        """
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+            for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job_id]
+            for index in (self._by_fingerprint, self._by_idempotency_key):
+                for key in [k for k, job_id in index.items() if job_id not in self._jobs]:
+                    del index[key]
@@ -9,15 +9,27 @@ from app.utils.data_models.agent_creation_item import (
 from langgraph.graph import StateGraph, END
 from app.utils.constants.roles import Role
 from app.utils.constants.models import ModelChoices
-from app.utils.data_models.agent_state import AgentState
-from langchain_core.messages import AIMessage
+from app.utils.data_models.agent_state import AgentState, past_deadline
+from langchain_core.runnables import RunnableLambda
 from app.utils.data_models.story_teller_item import StoryTellerItem
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
+from app.utils.constants.champion_lore import aget_lore
+from typing import Tuple
+import asyncio
+import contextlib
+import dataclasses
+import functools
 import os
+import uuid
 
 
 class StoryTeller:
+    # Where the graph state is checkpointed after every step:
+    # - "none": nowhere, the story cannot be inspected or resumed afterwards
+    # - "memory": in this StoryTeller only, for previews and benchmarks
+    # - "sqlite": the checkpoint database, through SqliteSaver (invoke/stream only)
+    # - "aiosqlite": the checkpoint database, through AsyncSqliteSaver (ainvoke/astream only)
+    CHECKPOINTERS = ("none", "memory", "sqlite", "aiosqlite")
+
     def __init__(self, scenario, champions_json, logger):
         self.graph = StateGraph(AgentState)
         self.scenario = scenario
@@ -28,14 +40,39 @@ class StoryTeller:
         self.app = None
     
     def __init__(self, story_teller_item: StoryTellerItem):
-        self.graph = StateGraph(AgentState)
         self.scenario = story_teller_item.scenario
         self.champions_json = story_teller_item.champions
         self.logger = story_teller_item.logger
+        self.lore = story_teller_item.lore or {}
+        self.deadline = story_teller_item.deadline
+        self.thread_id = checkpoint_thread_id(story_teller_item.story_id or uuid.uuid4().hex)
+        self.checkpointer = story_teller_item.checkpointer
+        if self.checkpointer is not None and self.checkpointer not in self.CHECKPOINTERS:
+            raise ValueError(
+                f"Unknown checkpointer '{self.checkpointer}', expected one of {self.CHECKPOINTERS}."
+            )
+        self._memory_saver = None
         self.agent_factory = AgentFactory(self.logger)
         self._preprocess_input()
+        # Champion name -> summarized lore of every champion, including what was summarized here
+        self.lore = {name: agent.lore for name, agent in self.champion_agents.items()}
+        self._create_bots()
         self.app = None
 
+    @classmethod
+    async def acreate(cls, story_teller_item: StoryTellerItem) -> "StoryTeller":
+        """
+        Async constructor: fetches and summarizes every champion's lore concurrently
+        instead of one champion after the other, then builds the StoryTeller with it.
+        Lore already given in the item is not summarized again.
+        """
+        known = story_teller_item.lore or {}
+        names = [champ["name"] for champ in story_teller_item.champions if not known.get(champ["name"])]
+        lores = await asyncio.gather(
+            *(aget_lore(Role[name].value, story_context=story_teller_item.scenario) for name in names)
+        )
+        return cls(dataclasses.replace(story_teller_item, lore={**known, **dict(zip(names, lores))}))
+
     def _preprocess_input(self):
         self.champion_agents = {}
         for champ in self.champions_json:
@@ -46,14 +83,73 @@ class StoryTeller:
                 role=Role[champ_name], 
                 model=champ_model, 
                 traits=champ_traits,
-                story_context=self.scenario  # Pass scenario for lore summarization
+                story_context=self.scenario,  # Pass scenario for lore summarization
+                lore=self.lore.get(champ_name),
             )
             self.champion_agents[champ_name] = self.agent_factory.create_champion_agent(
                 champ_agent_config
             )
-            self.graph.add_node(champ_name, self.champion_agents[champ_name])
 
     def build_graph(self):
+        """
+        Gets the compiled graph of this cast (see compiled_graph) and attaches the checkpointer
+        for invoke() and stream().
+        """
+        kind = self.checkpointer or "sqlite"
+        if kind == "aiosqlite":
+            raise ValueError("The aiosqlite checkpointer can only be used with ainvoke() and astream().")
+
+        memory = None
+        if kind == "memory":
+            memory = self._in_memory_saver()
+        elif kind == "sqlite":
+            from app.database.checkpoint_store import get_checkpoint_store
+
+            # Shared by every StoryTeller of the process
+            memory = get_checkpoint_store()
+        self.app = self._graph(memory)
+
+    @contextlib.asynccontextmanager
+    async def _async_graph(self):
+        """
+        The compiled graph with the checkpointer for one ainvoke() or astream() run.
+        """
+        kind = self.checkpointer or "aiosqlite"
+        if kind == "sqlite":
+            raise ValueError("The sqlite checkpointer can only be used with invoke() and stream().")
+
+        if kind == "aiosqlite":
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            from app.database.checkpoint_store import get_checkpoint_store
+
+            # An aiosqlite connection belongs to the run's event loop, so it is opened per run,
+            # tuned and serialized like the shared store
+            store = get_checkpoint_store()
+            async with aiosqlite.connect(store.db_path) as conn:
+                for pragma in store.pragmas:
+                    await conn.execute(pragma)
+                yield self._graph(AsyncSqliteSaver(conn, serde=store.serde))
+        else:
+            yield self._graph(self._in_memory_saver() if kind == "memory" else None)
+
+    def _graph(self, checkpointer):
+        return compiled_graph(self.champion_agents.keys()).copy(update={"checkpointer": checkpointer})
+
+    def _in_memory_saver(self):
+        from langgraph.checkpoint.memory import InMemorySaver
+        from app.database.checkpoint_serde import checkpoint_serializer
+
+        # One per StoryTeller, so the checkpoints live exactly as long as the story
+        if self._memory_saver is None:
+            self._memory_saver = InMemorySaver(serde=checkpoint_serializer())
+        return self._memory_saver
+
+    def _create_bots(self):
+        """
+        Creates this story's bot agents; together with the champion agents they are handed to
+        the shared graph through the run config.
+        """
         event_bot = self.agent_factory.create_event_creator_agent(
             EventCreatorAgentConfig(
                 role=Role.Event,
@@ -84,64 +180,232 @@ class StoryTeller:
             )
         )
 
-        self.graph.add_node("RoleAssignerBot", role_bot)
-        self.graph.add_node("EventCreatorBot", event_bot)
-        self.graph.add_node("NovelWriterBot", novel_bot)
-        self.graph.add_node("SummarizerBot", summarizer_bot)
-
-        self.graph.set_entry_point("EventCreatorBot")
-        self.graph.add_edge("EventCreatorBot", "RoleAssignerBot")
-
-        self.graph.add_conditional_edges(
-            "RoleAssignerBot",
-            role_assigner_node,
-            list(self.champion_agents.keys()) + ["NovelWriterBot", "RoleAssignerBot"],
-        )
-        for champ in self.champion_agents.keys():
-            self.graph.add_edge(champ, "SummarizerBot")
-            self.graph.add_edge("SummarizerBot", "RoleAssignerBot")
-        self.graph.add_edge("NovelWriterBot", END)
+        self.agents = {
+            **self.champion_agents,
+            "RoleAssignerBot": role_bot,
+            "EventCreatorBot": event_bot,
+            "NovelWriterBot": novel_bot,
+            "SummarizerBot": summarizer_bot,
+        }
 
-        # folder to store sqlite db
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        db_folder = os.path.abspath(os.path.join(base_dir, "..", "..", "..", "logs"))
-        conn = sqlite3.connect(f"{db_folder}/langgraph_checkpoints.sqlite", check_same_thread=False)
-        memory = SqliteSaver(conn)
-        self.app = self.graph.compile(checkpointer=memory)
+    @staticmethod
+    def checkpoint_db_path() -> str:
+        from app.database.checkpoint_store import checkpoint_db_path
 
-        with open("graph.png", "wb") as f:
-            f.write(self.app.get_graph().draw_mermaid_png())
+        return checkpoint_db_path()
 
-    def invoke(self):
-        thread_id = "session_1"
-        
+    def _run_config(self) -> dict:
         # Create the configurable dictionary with recursion_limit included
-        config = {
+        return {
             "configurable": {
-                "thread_id": thread_id
+                "thread_id": self.thread_id,
+                # Looked up by the graph's nodes (see _agent_node)
+                "agents": self.agents,
+                # Read by past_deadline; kept out of the state so that a resume does not restore it
+                "deadline": self.deadline,
             },
             "recursion_limit": 100
         }
 
-        self.app.invoke(
-            AgentState(
-                messages=[], 
-                model=None, 
-                next_bot=[], 
-                event_list=[], 
-                ai_response=""
-            ),
-            config  # Pass config as the second argument
+    def _initial_state(self) -> AgentState:
+        return AgentState(
+            messages=[],
+            model=None,
+            next_bot=[],
+            event_list=[],
+            ai_response="",
+        )
+
+    def invoke(self):
+        final_state = self.app.invoke(
+            self._initial_state(),
+            self._run_config()  # Pass config as the second argument
         )
+        return self.format_result(final_state)
+
+    def stream(self, resume: bool = False):
+        """
+        Runs the graph and yields (frame_type, payload) tuples as soon as each node finishes:
+        - ("event", {"text"}) for every event line produced by the EventCreatorBot
+        - ("speaker", {"name"}) for every RoleAssignerBot pick (champion name or "Event")
+        - ("line", {"champion", "text"}) for every champion line
+        - ("chunk", {"agent", "text"}) for every token chunk of a streaming agent (the NovelWriterBot)
+        - ("novel", {"text"}) once the NovelWriterBot is done
+        - ("done", result) with the same result as invoke()
+        Closing the generator early stops the graph after the node that is currently running.
+
+        With `resume`, the story continues from its last checkpoint instead of starting over (see
+        _resume_input); only the frames of the nodes that run now are yielded.
+        """
+        graph_input, final_state = self._resume_input(self.app) if resume else (self._initial_state(), None)
+        if final_state is None:
+            for mode, chunk in self.app.stream(
+                graph_input,
+                self._run_config(),
+                stream_mode=["updates", "values", "custom"],
+            ):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                yield from self._frames_for_chunk(mode, chunk)
+
+        yield "done", self.format_result(final_state or {})
+
+    async def ainvoke(self):
+        """
+        Async version of invoke(). SqliteSaver cannot serve async runs, so by default the graph
+        is checkpointed through an AsyncSqliteSaver on the same checkpoint file for this run.
+        """
+        async with self._async_graph() as app:
+            final_state = await app.ainvoke(self._initial_state(), self._run_config())
+        return self.format_result(final_state)
+
+    async def astream(self, resume: bool = False):
+        """
+        Async version of stream(), yielding the same frames.
+        """
+        async with self._async_graph() as app:
+            graph_input, final_state = (
+                await self._aresume_input(app) if resume else (self._initial_state(), None)
+            )
+            if final_state is None:
+                async for mode, chunk in app.astream(
+                    graph_input,
+                    self._run_config(),
+                    stream_mode=["updates", "values", "custom"],
+                ):
+                    if mode == "values":
+                        final_state = chunk
+                        continue
+                    for frame in self._frames_for_chunk(mode, chunk):
+                        yield frame
+
+        yield "done", self.format_result(final_state or {})
+
+    def _resume_input(self, app):
+        """
+        Where a resumed run starts, as (graph input, final state):
+        - no checkpoint with state yet: (initial state, None), the story starts over, nothing ran
+        - the graph already ended: (None, its final state), nothing is left to run
+        - otherwise: (None, None), the graph continues after the last completed node; a node whose
+          writes were saved before the run stopped counts as completed
+
+        The deadline is not restored from the checkpoint: the resumed run gets its own, from the
+        StoryTellerItem it was created with (see past_deadline).
+        """
+        return self._resume_point(app.get_state(self._run_config()))
+
+    async def _aresume_input(self, app):
+        return self._resume_point(await app.aget_state(self._run_config()))
+
+    def _resume_point(self, snapshot):
+        if not snapshot.values:
+            return self._initial_state(), None
+        # `next` is empty as well when the pending node already has its writes, `tasks` is not
+        if not snapshot.tasks:
+            return None, snapshot.values
+        return None, None
+
+    def _frames_for_chunk(self, mode: str, chunk):
+        if mode == "custom":
+            yield "chunk", chunk
+            return
+        for node_name, output in chunk.items():
+            yield from self._frames_for_update(node_name, output or {})
+
+    def _frames_for_update(self, node_name: str, output: dict):
+        ai_response = output.get("ai_response")
+        text = ai_response.content.strip() if hasattr(ai_response, "content") else ""
+
+        if node_name == "EventCreatorBot":
+            for line in text.split("\n"):
+                if line.strip():
+                    yield "event", {"text": line.strip()}
+        elif node_name == "RoleAssignerBot":
+            if output.get("next_bot"):
+                yield "speaker", {"name": output["next_bot"][-1]}
+        elif node_name == "NovelWriterBot":
+            yield "novel", {"text": text}
+        elif node_name in self.champion_agents:
+            yield "line", {"champion": node_name, "text": text}
+
+    @staticmethod
+    def format_result(state: AgentState) -> dict:
+        """
+        Converts the final graph state into a JSON-serializable story result.
+        """
+        novel = state.get("ai_response")
+        return {
+            "novel": novel.content if hasattr(novel, "content") else (novel or ""),
+            "script": [msg.content for msg in state.get("messages", [])],
+            "speakers": list(state.get("next_bot", [])),
+        }
+
+def checkpoint_thread_id(story_id: str) -> str:
+    """
+    Checkpoint thread of a story. Every story gets its own thread, so reading or writing its
+    checkpoints only touches its own rows; the namespace keeps deployments sharing a
+    checkpoint database apart.
+    """
+    return f"{os.getenv('CHECKPOINT_NAMESPACE', 'rito')}:{story_id}"
+
+
+def compiled_graph(champion_names):
+    """
+    The compiled story graph (without checkpointer) for a cast. The topology only depends on the
+    champions' node names, so it is built and compiled once per cast and shared by every story;
+    the nodes find the agents of the current story in the run config.
+    """
+    return _compile_story_graph(tuple(sorted(champion_names)))
 
-def role_assigner_node(state):
+
+@functools.lru_cache(maxsize=128)
+def _compile_story_graph(cast: Tuple[str, ...]):
+    return build_story_graph(cast).compile()
+
+
+def build_story_graph(cast: Tuple[str, ...]) -> StateGraph:
+    graph = StateGraph(AgentState)
+    for name in (*cast, "RoleAssignerBot", "EventCreatorBot", "NovelWriterBot", "SummarizerBot"):
+        graph.add_node(name, _agent_node(name))
+
+    graph.set_entry_point("EventCreatorBot")
+    graph.add_edge("EventCreatorBot", "RoleAssignerBot")
+
+    graph.add_conditional_edges(
+        "RoleAssignerBot",
+        role_assigner_node,
+        list(cast) + ["NovelWriterBot", "RoleAssignerBot"],
+    )
+    for champ in cast:
+        graph.add_conditional_edges(champ, champion_node, ["SummarizerBot", "NovelWriterBot"])
+    graph.add_edge("SummarizerBot", "RoleAssignerBot")
+    graph.add_edge("NovelWriterBot", END)
+    return graph
+
+
+def _agent_node(name: str) -> RunnableLambda:
+    """
+    Graph node that runs the agent registered as `name` in config["configurable"]["agents"],
+    synchronously or awaited depending on how the graph is run.
+    """
+    def call(state, config):
+        return config["configurable"]["agents"][name](state)
+
+    async def acall(state, config):
+        return await config["configurable"]["agents"][name].__acall__(state)
+
+    return RunnableLambda(call, afunc=acall, name=name)
+
+
+def role_assigner_node(state, config):
     if len(state["next_bot"]) > 0:
         next_bot = state["next_bot"][-1]
-        if (next_bot == "Event") and (len(state["event_list"]) == 0):
+        if (next_bot == "Event") and (len(state["event_list"]) == 0 or past_deadline(config)):
+            # Out of events, or out of time: the remaining events are skipped
             return "NovelWriterBot"
         elif next_bot == "Event":
-            next_event = state["event_list"].popleft()
-            state["messages"].append(AIMessage(content=next_event))
+            # The RoleAssignerBot plays the next event before picking who reacts to it
             return "RoleAssignerBot"
         else:
             return next_bot
@@ -149,6 +413,13 @@ def role_assigner_node(state):
         raise Exception("Something wrong")
 
 
+def champion_node(state, config):
+    # Past the deadline the history is not worth compressing anymore, the novel is written next
+    if past_deadline(config):
+        return "NovelWriterBot"
+    return "SummarizerBot"
+
+
 if __name__ == "__main__":
     from .logger import Logger
 
@@ -18,6 +18,7 @@ class ChampionAgentConfig(BaseAgentConfig):
 
     traits: Set[str]
     story_context: str = None  # Optional story context for lore summarization
+    lore: str = None  # Optional already summarized lore, skips fetching it
 
 
 @dataclass
@@ -1,12 +1,37 @@
-from typing import List, TypedDict
+import time
+from typing import Annotated, List, Optional, TypedDict
 from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_config
+from langgraph.graph.message import add_messages
 from app.utils.constants.models import ModelChoices
 
 class AgentState(TypedDict, total=False):
     """Runtime state passed between graph nodes."""
 
-    messages: List[BaseMessage]
+    # Nodes return only the messages they add; the reducer appends them, and a
+    # RemoveMessage(REMOVE_ALL_MESSAGES) in front replaces the whole history (see SummarizerAgent)
+    messages: Annotated[List[BaseMessage], add_messages]
     model: ModelChoices
     next_bot: List[str]
     event_list: List[str]
     ai_response: str
+
+
+def past_deadline(config: Optional[RunnableConfig] = None) -> bool:
+    """
+    True once the run's deadline has passed: no new scene should be started, the story
+    goes straight to the NovelWriterBot with what was played so far.
+
+    The deadline (epoch seconds, None for no limit) is config["configurable"]["deadline"] and
+    not part of the state, so that it is not checkpointed: a resumed story runs against the
+    deadline of the resuming run. Without `config`, the config of the running graph node is used.
+    """
+    if config is None:
+        try:
+            config = get_config()
+        except RuntimeError:
+            # Not called from a graph node: no run, no deadline
+            return False
+    deadline = config.get("configurable", {}).get("deadline")
+    return deadline is not None and time.time() >= deadline
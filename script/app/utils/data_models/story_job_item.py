@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import threading
+import time
+
+
+class JobStatus(Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+@dataclass
+class StoryJobItem:
+    """
+    Item that tracks a single story generation job handled by the StoryJobManager.
+    Besides the final result, the job keeps every frame the story produced so far
+    (see StoryTeller.stream), so any number of clients can follow or replay the run.
+    Once the job finishes its token chunks are compacted (see _compact_frames).
+    """
+    job_id: str
+    fingerprint: Optional[str] = None
+    # Idempotency key of the submission that created the job, stored with the story
+    idempotency_key: Optional[str] = None
+    status: JobStatus = JobStatus.queued
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    frames: List[Tuple[str, Any]] = field(default_factory=list, repr=False)
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+    _cancel_requested: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def request_cancel(self):
+        """
+        Asks the running story to stop; the job function checks this between graph nodes.
+        """
+        self._cancel_requested.set()
+
+    def set_status(self, status: JobStatus):
+        with self._changed:
+            self.status = status
+            if status == JobStatus.running:
+                self.started_at = time.time()
+            elif self.is_finished:
+                self.finished_at = time.time()
+                # A new list: clients already following keep iterating the one they started on
+                self.frames = _compact_frames(self.frames)
+            self._changed.notify_all()
+
+    def publish(self, frame_type: str, payload: Any):
+        with self._changed:
+            self.frames.append((frame_type, payload))
+            self._changed.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until the job is finished. Returns False if the timeout expired first.
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: self.is_finished, timeout)
+
+    def iter_frames(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields every frame published so far, then follows new frames until the job finishes.
+        """
+        with self._changed:
+            frames = self.frames
+        index = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: len(frames) > index or self.is_finished)
+                new_frames = frames[index:]
+                finished = self.is_finished
+            yield from new_frames
+            index += len(new_frames)
+            if finished and index >= len(frames):
+                return
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "result": self.result,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _compact_frames(frames: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    """
+    The frames of a finished job without its token chunks: a run of chunks followed by the
+    "novel" frame is dropped, the novel frame has the same text; any other run is collapsed
+    into one chunk frame per agent (e.g. the partial novel of a cancelled story).
+    """
+    compacted: List[Tuple[str, Any]] = []
+    run: List[Tuple[str, Any]] = []
+
+    def flush_run(dropped: bool):
+        if not dropped:
+            texts: Dict[str, List[str]] = {}
+            for _, payload in run:
+                texts.setdefault(payload.get("agent"), []).append(payload.get("text") or "")
+            compacted.extend(("chunk", {"agent": agent, "text": "".join(parts)}) for agent, parts in texts.items())
+        run.clear()
+
+    for frame in frames:
+        if frame[0] == "chunk":
+            run.append(frame)
+            continue
+        if run:
+            flush_run(dropped=frame[0] == "novel")
+        compacted.append(frame)
+    if run:
+        flush_run(dropped=False)
+    return compacted
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from app.utils.core.logger import Logger
 
 @dataclass
@@ -10,4 +10,13 @@ class StoryTellerItem:
     scenario: str
     champions: List[Dict[str, Any]]
     logger: Logger
+    # Champion name -> summarized lore, if already fetched (see StoryTeller.acreate)
+    lore: Optional[Dict[str, str]] = None
+    # Epoch seconds by which the story should start wrapping up, None for no limit
+    deadline: Optional[float] = None
+    # Id of the story, its checkpoints are kept under checkpoint_thread_id(story_id); generated if None
+    story_id: Optional[str] = None
+    # "none", "memory", "sqlite" or "aiosqlite" (see StoryTeller.CHECKPOINTERS); None picks the
+    # SQLite saver matching the run, "sqlite" for invoke/stream and "aiosqlite" for ainvoke/astream
+    checkpointer: Optional[str] = None
     
@@ -1,16 +1,13 @@
-import os
+import asyncio
+import logging
 from dotenv import load_dotenv
-import google.generativeai as genai
+from app.utils.constants.models import get_gemini_model
 
 load_dotenv()
 
-_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not _API_KEY:
-    raise RuntimeError("GOOGLE_API_KEY missing in environment")
-
-genai.configure(api_key=_API_KEY)
 _GEMINI_MODEL_NAME = "gemini-2.0-flash-lite"
-_gemini_model = genai.GenerativeModel(_GEMINI_MODEL_NAME)
+
+log = logging.getLogger(__name__)
 
 
 def summarize_lore(champion_name: str, full_lore: str, story_context: str) -> str:
@@ -28,8 +25,37 @@ def summarize_lore(champion_name: str, full_lore: str, story_context: str) -> st
     """
     if not full_lore:
         return f"{champion_name} is a champion from League of Legends."
-    
-    prompt = f"""
+
+    try:
+        response = get_gemini_model(_GEMINI_MODEL_NAME).generate_content(_lore_prompt(champion_name, full_lore, story_context))
+        return _summary_or_fallback(response.text, full_lore)
+    except Exception as e:
+        log.warning("Could not summarize the lore of %s, using its beginning instead: %s", champion_name, e)
+        return _create_basic_summary(full_lore)
+
+
+async def asummarize_lore(champion_name: str, full_lore: str, story_context: str) -> str:
+    """
+    Async version of summarize_lore; the Gemini call runs in a thread instead of blocking the
+    event loop. The SDK's async client is bound to the loop that created it and stories run on
+    short-lived loops, so the cached model is only used synchronously.
+    """
+    if not full_lore:
+        return f"{champion_name} is a champion from League of Legends."
+
+    try:
+        response = await asyncio.to_thread(
+            get_gemini_model(_GEMINI_MODEL_NAME).generate_content,
+            _lore_prompt(champion_name, full_lore, story_context),
+        )
+        return _summary_or_fallback(response.text, full_lore)
+    except Exception as e:
+        log.warning("Could not summarize the lore of %s, using its beginning instead: %s", champion_name, e)
+        return _create_basic_summary(full_lore)
+
+
+def _lore_prompt(champion_name: str, full_lore: str, story_context: str) -> str:
+    return f"""
     You are tasked with summarizing a League of Legends champion's lore for use in a roleplay scenario.
     
     Champion: {champion_name}
@@ -50,21 +76,17 @@ def summarize_lore(champion_name: str, full_lore: str, story_context: str) -> st
     7. Write in third person, present tense.
     8. Output ONLY the summary text with no extra commentary or formatting.
     """
-    
-    try:
-        response = _gemini_model.generate_content(prompt)
-        summarized = (response.text or "").strip()
-        
-        # Fallback if response is empty or too short
-        if len(summarized) < 50:
-            return _create_basic_summary(full_lore)
-        
-        return summarized
-    
-    except Exception as e:
-        print(f"Error summarizing lore for {champion_name}: {e}")
+
+
+def _summary_or_fallback(text: str, full_lore: str) -> str:
+    summarized = (text or "").strip()
+
+    # Fallback if response is empty or too short
+    if len(summarized) < 50:
         return _create_basic_summary(full_lore)
 
+    return summarized
+
 
 def _create_basic_summary(full_lore: str) -> str:
     """
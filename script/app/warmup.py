@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from app.data_extraction.fetch_from_s3 import get_s3_client
+from app.database.preflight_cache import get_preflight_cache
+from app.database.story_store import get_story_store
+from app.utils.constants.champion_lore import preload_lore
+from app.utils.constants.models import ModelChoices
+from app.utils.constants.roles import Role
+
+
+class Warmup:
+    """
+    Warm-up of one worker process: creates the clients and opens the databases the first story
+    would otherwise pay for, so that /readyz only reports the worker ready once it is warm.
+
+    Every step is attempted even if an earlier one failed; a failed step is reported and its
+    work is simply done lazily by the first story that needs it.
+
+    Parameters
+    ----------
+    lore_champions : int
+        Number of most-used champions (according to the story store) whose lore is preloaded.
+    """
+
+    def __init__(self, lore_champions: int = 8):
+        self.lore_champions = lore_champions
+        self.steps: Dict[str, str] = {}
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def start(self, mode: str = "background"):
+        """
+        Runs the warm-up: "background" in a thread, "blocking" before returning,
+        "off" marks the worker ready without warming anything.
+        """
+        if mode == "off":
+            self._done.set()
+        elif mode == "blocking":
+            self.run()
+        else:
+            threading.Thread(target=self.run, name="warmup", daemon=True).start()
+
+    def run(self):
+        self.started_at = time.time()
+        for name, step in self._steps():
+            try:
+                step()
+                self.steps[name] = "ok"
+            except Exception as e:
+                print(f"Warm-up step {name} failed: {e}")
+                self.steps[name] = f"failed: {e}"
+        self.finished_at = time.time()
+        self._done.set()
+        print(f"Warm-up done in {self.finished_at - self.started_at:.1f}s: {self.steps}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "steps": self.steps,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def _steps(self) -> List[Tuple[str, Callable]]:
+        return [
+            ("llm_clients", _init_llm_clients),
+            ("checkpoint_db", _open_checkpoint_db),
+            ("local_stores", _open_local_stores),
+            ("s3_client", get_s3_client),
+            ("lore", self._preload_top_lore),
+        ]
+
+    def _preload_top_lore(self):
+        if self.lore_champions <= 0:
+            return
+        names = get_story_store().top_champions(self.lore_champions)
+        preload_lore([Role[name].value for name in names if name in Role.__members__])
+
+
+def _init_llm_clients():
+    # Dropped first: in a forked worker the inherited clients hold the parent's gRPC channels
+    for choice in ModelChoices:
+        choice.value.reset_llm()
+        choice.value.get_llm()
+
+
+def _open_checkpoint_db():
+    from app.database.checkpoint_store import get_checkpoint_store
+
+    get_checkpoint_store().setup()
+
+
+def _open_local_stores():
+    get_preflight_cache()
+    get_story_store()
+
+
+def start_warmup(app):
+    """
+    Starts the warm-up of `app` as configured by WARMUP; called by create_app, or by the
+    server after forking a worker when the app was preloaded (see gunicorn.conf.py).
+    """
+    app.extensions["warmup"].start(app.config["WARMUP"])
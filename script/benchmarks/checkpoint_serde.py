@@ -0,0 +1,84 @@
+"""
+Checkpoint serializers: LangGraph's JsonPlusSerializer against StorySerializer (see
+app.database.checkpoint_serde), with and without compression.
+
+Serializes the channel values of a story after `--turns` champion lines (the messages, the
+deque of remaining events and the picks) and reports the encoded size and the time
+to dump and to load them, after checking that every serializer round-trips the state.
+
+Run from the script/ folder:
+
+    python benchmarks/checkpoint_serde.py
+    python benchmarks/checkpoint_serde.py --turns 80 --number 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import timeit
+from collections import deque
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer  # noqa: E402
+from app.database.checkpoint_serde import StorySerializer  # noqa: E402
+
+LINE = "{name}: [narrows his eyes] The shadows do not forgive, and neither do I. We end this tonight."
+
+
+def story_state(turns: int) -> dict:
+    names = ["Zed", "Ahri", "Yasuo"]
+    messages = [AIMessage(content="Event: Event 1: A storm forces the group into an uneasy alliance.")]
+    for turn in range(turns):
+        name = names[turn % len(names)]
+        messages.append(
+            AIMessage(
+                content=LINE.format(name=name),
+                response_metadata={"model_name": "gemini-2.5-flash-lite", "finish_reason": "STOP"},
+                usage_metadata={"input_tokens": 900 + turn * 40, "output_tokens": 30, "total_tokens": 930 + turn * 40},
+            )
+        )
+    for i, message in enumerate(messages):
+        message.id = f"run-{i:04d}-5b1c0e6e-7f0a-4e4b-9d0a-2f3a1c9e8b7d"
+    return {
+        "messages": messages,
+        "event_list": deque(["Event 2: Zed suggests a dangerous shortcut.", "Event 3: The storm breaks."]),
+        "next_bot": [names[turn % len(names)] for turn in range(turns)],
+        "model": None,
+        "ai_response": messages[-1],
+    }
+
+
+def measure(fn, number: int, repeat: int) -> float:
+    return statistics.median(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40, help="champion lines in the serialized state")
+    parser.add_argument("--number", type=int, default=100, help="calls per round")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds, the median is reported")
+    args = parser.parse_args()
+
+    state = story_state(args.turns)
+    serializers = {
+        "jsonplus": JsonPlusSerializer(),
+        "story": StorySerializer(compress_min_bytes=0),
+        "story+zstd": StorySerializer(compress_min_bytes=1),
+    }
+
+    print(f"State after {args.turns} turns ({len(state['messages'])} messages), median of {args.repeat} rounds")
+    for name, serde in serializers.items():
+        dumped = serde.dumps_typed(state)
+        loaded = serde.loads_typed(dumped)
+        assert loaded == state, f"{name} does not round-trip the state"
+        assert type(loaded["event_list"]) is deque
+
+        dump = measure(lambda: serde.dumps_typed(state), args.number, args.repeat)
+        load = measure(lambda: serde.loads_typed(dumped), args.number, args.repeat)
+        print(f"  {name:<11} {len(dumped[1]):8d} bytes  dump {dump * 1e6:8.1f} us  load {load * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
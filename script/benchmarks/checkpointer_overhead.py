@@ -0,0 +1,109 @@
+"""
+Per-step overhead of the story checkpointers (see StoryTeller.CHECKPOINTERS).
+
+Runs a graph whose single node plays one story turn per step (a line appended to `messages`,
+like a champion node, so the checkpointed state grows as it does in a story) with every
+checkpointer and reports the time per step, and the overhead over running without checkpointer.
+The SQLite savers write to a temporary database.
+
+Run from the script/ folder:
+
+    python benchmarks/checkpointer_overhead.py
+    python benchmarks/checkpointer_overhead.py --steps 60 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.checkpoint.sqlite import SqliteSaver  # noqa: E402
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver  # noqa: E402
+from langgraph.graph import END, StateGraph  # noqa: E402
+from app.utils.data_models.agent_state import AgentState  # noqa: E402
+
+LINE = "Zed: [narrows his eyes] The shadows do not forgive, and neither do I. " * 3
+
+
+def build_graph(steps: int) -> StateGraph:
+    def turn(state: AgentState) -> AgentState:
+        ai = AIMessage(content=LINE)
+        return {"messages": [ai], "ai_response": ai, "next_bot": state["next_bot"] + ["Zed"]}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("turn", turn)
+    graph.set_entry_point("turn")
+    graph.add_conditional_edges("turn", lambda state: "turn" if len(state["next_bot"]) < steps else END)
+    return graph
+
+
+def _initial_state() -> AgentState:
+    return AgentState(messages=[], model=None, next_bot=[], event_list=[], ai_response="")
+
+
+def _config(steps: int) -> dict:
+    return {"configurable": {"thread_id": uuid.uuid4().hex}, "recursion_limit": steps + 10}
+
+
+def run_sync(graph: StateGraph, checkpointer, steps: int) -> float:
+    app = graph.compile(checkpointer=checkpointer)
+    start = time.perf_counter()
+    app.invoke(_initial_state(), _config(steps))
+    return time.perf_counter() - start
+
+
+async def run_async(graph: StateGraph, db_path, steps: int) -> float:
+    if db_path is None:
+        app = graph.compile()
+        start = time.perf_counter()
+        await app.ainvoke(_initial_state(), _config(steps))
+        return time.perf_counter() - start
+
+    async with AsyncSqliteSaver.from_conn_string(db_path) as checkpointer:
+        await checkpointer.setup()
+        app = graph.compile(checkpointer=checkpointer)
+        start = time.perf_counter()
+        await app.ainvoke(_initial_state(), _config(steps))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=40, help="graph steps per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per checkpointer, the median is reported")
+    args = parser.parse_args()
+
+    graph = build_graph(args.steps)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "checkpoints.sqlite")
+        sqlite_saver = SqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+        sqlite_saver.setup()
+
+        variants = [
+            ("none", lambda: run_sync(graph, None, args.steps)),
+            ("memory", lambda: run_sync(graph, InMemorySaver(), args.steps)),
+            ("sqlite", lambda: run_sync(graph, sqlite_saver, args.steps)),
+            ("none (async)", lambda: asyncio.run(run_async(graph, None, args.steps))),
+            ("aiosqlite", lambda: asyncio.run(run_async(graph, db_path, args.steps))),
+        ]
+        results = {}
+        for name, run in variants:
+            run()  # warm-up
+            results[name] = statistics.median(run() for _ in range(args.repeat)) / args.steps
+
+    print(f"{args.steps} steps per run, median of {args.repeat} runs")
+    for name, per_step in results.items():
+        baseline = results["none (async)" if name in ("none (async)", "aiosqlite") else "none"]
+        print(f"  {name:<14} {per_step * 1e6:9.1f} us/step  (+{(per_step - baseline) * 1e6:8.1f} us over none)")
+
+
+if __name__ == "__main__":
+    main()
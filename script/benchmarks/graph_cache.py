@@ -0,0 +1,62 @@
+"""
+Micro-benchmark of the compiled story graph cache (see app.utils.core.story_teller.compiled_graph).
+
+Compares what every story used to pay, building and compiling the StateGraph of its cast, with
+a cache hit, and with what a run still pays on a hit: attaching its checkpointer to a copy of
+the cached graph.
+
+Run from the script/ folder:
+
+    python benchmarks/graph_cache.py
+    python benchmarks/graph_cache.py Zed Ahri Yasuo Jinx --number 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import timeit
+from typing import Callable, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from app.utils.core.story_teller import build_story_graph, compiled_graph  # noqa: E402
+
+DEFAULT_CAST = ["Zed", "Ahri", "Yasuo"]
+
+
+def measure(fn: Callable, number: int, repeat: int) -> float:
+    """
+    Median seconds per call of `fn` over `repeat` rounds of `number` calls.
+    """
+    rounds = timeit.repeat(fn, number=number, repeat=repeat)
+    return statistics.median(rounds) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cast", nargs="*", default=DEFAULT_CAST, help="champion node names")
+    parser.add_argument("--number", type=int, default=50, help="calls per round")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds, the median is reported")
+    args = parser.parse_args()
+
+    cast: List[str] = args.cast
+    checkpointer = InMemorySaver()
+    compiled_graph(cast)  # warm the cache
+
+    results = [
+        ("build + compile", measure(lambda: build_story_graph(tuple(cast)).compile(), args.number, args.repeat)),
+        ("cache hit", measure(lambda: compiled_graph(cast), args.number, args.repeat)),
+        ("cache hit + checkpointer", measure(
+            lambda: compiled_graph(cast).copy(update={"checkpointer": checkpointer}), args.number, args.repeat
+        )),
+    ]
+
+    print(f"Cast of {len(cast)}: {', '.join(cast)}")
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"  {name:<26} {seconds * 1e6:10.1f} us  ({baseline / seconds:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Import-time report for the app's entry modules, in the style of `python -X importtime`.
+
+Every target is imported in a fresh interpreter (so nothing is cached in-process) with
+`-X importtime`; the report shows the total import time of the target and the modules that
+cost the most, so a heavy import that sneaks back onto the startup path is easy to spot.
+
+Run from the script/ folder:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py app.routes --repeat 5 --top 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+SCRIPT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# What a CLI tool, a story and a web worker import respectively
+DEFAULT_TARGETS = ["app", "app.utils.core.story_teller", "app.routes"]
+
+
+def measure(target: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Imports `target` in a fresh interpreter. Returns (total seconds, {module: cumulative seconds}).
+    """
+    modules = _run_importtime(f"import {target}")
+    return modules.get(target, 0.0), modules
+
+
+def _run_importtime(code: str) -> Dict[str, float]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SCRIPT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us) / 1e6
+    return cumulative
+
+
+def report(target: str, repeat: int, top: int, startup_modules: Set[str]) -> float:
+    runs: List[Tuple[float, Dict[str, float]]] = [measure(target) for _ in range(repeat)]
+    totals = [total for total, _ in runs]
+    median_total = statistics.median(totals)
+    _, modules = min(runs, key=lambda run: abs(run[0] - median_total))
+
+    print(f"\n{target}: median {median_total * 1000:.0f} ms over {repeat} runs "
+          f"(min {min(totals) * 1000:.0f} ms, max {max(totals) * 1000:.0f} ms)")
+    # Only top-level packages, their submodules are already included in the cumulative time;
+    # modules every interpreter imports at startup are not the target's doing
+    packages = {
+        name: seconds
+        for name, seconds in modules.items()
+        if "." not in name and name != target and name not in startup_modules
+    }
+    for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    return median_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=15, help="heaviest packages to list")
+    args = parser.parse_args()
+
+    startup_modules = set(_run_importtime("pass"))
+    for target in args.targets:
+        report(target, args.repeat, args.top, startup_modules)
+
+
+if __name__ == "__main__":
+    main()
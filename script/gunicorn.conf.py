@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for production. Run from the script/ folder:
+
+    gunicorn -c gunicorn.conf.py
+
+Every setting can be tuned through the environment:
+- GUNICORN_BIND: address to listen on (default 0.0.0.0:8000)
+- GUNICORN_WORKERS: number of worker processes (default 2)
+- GUNICORN_THREADS: request threads per worker; every streaming client holds one (default 8)
+- GUNICORN_TIMEOUT: seconds before a silent worker is restarted (default 120)
+"""
+import os
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+
+# Build the app and the shared state once in the master, then fork the workers
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Network clients must not be shared across the fork: every worker warms up its own.
+    # wsgi is already imported by the preloading master, this is the same app object
+    from app.database.checkpoint_retention import start_checkpoint_retention
+    from app.warmup import start_warmup
+    from wsgi import app
+
+    start_warmup(app)
+    start_checkpoint_retention(app)
@@ -0,0 +1,12 @@
+"""
+Production WSGI entry point, e.g. `gunicorn -c gunicorn.conf.py` (see gunicorn.conf.py).
+With preload_app the app and the shared read-only state are built once in the master
+and inherited copy-on-write by every worker. run.py remains the development server.
+"""
+from app import create_app
+from app.preload import preload_shared_state
+
+# The warm-up creates network clients and the checkpoint retention a thread, so both start
+# in each worker after the fork (post_fork)
+app = create_app(warm_up=False)
+preload_shared_state()